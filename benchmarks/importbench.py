@@ -0,0 +1,72 @@
+'''
+Compares loading a large scale collection file with json.load, as MainWindow.load did, and with a
+scaleimport.ScaleImporter, for the time, the peak memory and the longest batch (the longest the window would not
+redraw):
+
+    python benchmarks/importbench.py --families 200000
+
+The file has the 2048 pitch class sets that have the root, repeated with new names and mode names, so all but
+the first of each set are duplicates.
+'''
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scaleimport import ScaleImporter
+
+
+def writeCatalog(fileName, numOfFamilies):
+    with open(fileName, 'w') as fp:
+        fp.write('{')
+        for indx in range(numOfFamilies):
+            mask = ((indx % 2048) << 1) | 1
+            tones = [tone for tone in range(12) if mask >> tone & 1] + [12]
+            intervals = [upper - lower for lower, upper in zip(tones, tones[1:])]
+            modes = [f"Mode {modeIndx + 1} of catalog entry {indx}" for modeIndx in range(len(intervals))]
+            fp.write(f'{"," if indx else ""}\n {json.dumps(f"Family {indx}")}: {json.dumps([intervals, modes])}')
+        fp.write('\n}\n')
+
+
+def jsonLoad(fileName, batchSize):
+    with open(fileName, 'r') as fp:
+        scales = json.load(fp)
+    return len(scales), 0.0
+
+
+def streamed(fileName, batchSize):
+    scales = {}
+    importer = ScaleImporter(fileName, scales)
+    longest = 0.0
+    while not importer.done:
+        t0 = time.perf_counter()
+        scales.update(importer.nextBatch(batchSize))
+        longest = max(longest, time.perf_counter() - t0)
+    return len(scales), longest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time json.load and the streaming import of a scale collection.")
+    parser.add_argument("--families", help="number of entries in the file", type=int, default=200000)
+    parser.add_argument("--batch", help="families per ScaleImporter batch", type=int, default=500)
+    cmdargs = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmpDir:
+        fileName = os.path.join(tmpDir, "catalog.json")
+        writeCatalog(fileName, cmdargs.families)
+        print(f"{cmdargs.families} entries, {os.path.getsize(fileName) / 1024 / 1024:.1f} MiB")
+        for label, method in (("json.load", jsonLoad), ("ScaleImporter", streamed)):
+            t0 = time.perf_counter()
+            numOfFamilies, longest = method(fileName, cmdargs.batch)
+            elapsed = time.perf_counter() - t0
+            # tracemalloc slows python down a lot, the memory is measured on a second run
+            tracemalloc.start()
+            method(fileName, cmdargs.batch)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{label:14} {numOfFamilies:7} families: {1000 * elapsed:8.0f} ms, peak {peak / 1024 / 1024:7.1f} MiB"
+                  + (f", longest batch {1000 * longest:.1f} ms" if longest else ""))
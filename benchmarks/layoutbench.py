@@ -0,0 +1,72 @@
+'''
+Times the chord text layout (TextPentagonContainer.layoutGrphTxtItems) while drawing every
+family x mode x key of a scale file at a chord level:
+
+    python benchmarks/layoutbench.py --level ALL SavedScales/myScales.json
+
+Run it offscreen (QT_QPA_PLATFORM=offscreen) on two commits to compare them.
+'''
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QPointF
+from PyQt6.QtWidgets import QApplication, QGraphicsScene
+
+import utils
+from musicalclasses import Scale, Chorder
+from scalecore import ChordLevel, ChordSymbol, allKeys
+from textlayout import layoutCache
+from utils import Pens
+
+
+def run(scales, level, repeat):
+    app = QApplication.instance() or QApplication([])
+    scene = QGraphicsScene()
+    chorder = Chorder(scene, ChordSymbol.JAZZ, level)
+    layoutTime = [0.0, 0]
+    layout = utils.TextPentagonContainer.layoutGrphTxtItems
+
+    def timedLayout(self):
+        t0 = time.perf_counter()
+        layout(self)
+        layoutTime[0] += time.perf_counter() - t0
+        layoutTime[1] += 1
+
+    utils.TextPentagonContainer.layoutGrphTxtItems = timedLayout
+    t0 = time.perf_counter()
+    for arun in range(repeat):
+        for family, scaleDef in scales.items():
+            if sum(scaleDef[0]) != 12:
+                continue
+            scale = Scale(family, scaleDef, scene)
+            for amode in scaleDef[1]:
+                scale.mode = amode
+                for akey in allKeys[1:]:
+                    scale.key = akey
+                    scale.drawScale(QPointF(0, 0), 300, 180, Pens().black, level, chorder)
+            scale.deleteGraphicItems()
+    total = time.perf_counter() - t0
+    utils.TextPentagonContainer.layoutGrphTxtItems = layout
+    return total, layoutTime[0], layoutTime[1]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time the chord text layout of a scale file.")
+    parser.add_argument("scalefile", help="JSON scale file as written by File->Save")
+    parser.add_argument("--level", help="ChordLevel name", default="ALL")
+    parser.add_argument("--repeat", help="number of passes over the file", type=int, default=3)
+    parser.add_argument("--nocache", help="solve every layout, the layout cache is not used", action="store_true")
+    cmdargs = parser.parse_args()
+    with open(cmdargs.scalefile, "r") as fp:
+        catalog = json.load(fp)
+    if cmdargs.nocache:
+        layoutCache.maxsize = 0
+    total, layoutTotal, layouts = run(catalog, ChordLevel[cmdargs.level], cmdargs.repeat)
+    print(f"{cmdargs.level}: {layouts} layouts in {1000 * layoutTotal:.1f} ms "
+          f"({1e6 * layoutTotal / max(layouts, 1):.1f} us each), drawScale total {1000 * total:.1f} ms, "
+          f"layout cache hits {layoutCache.hits} misses {layoutCache.misses}")
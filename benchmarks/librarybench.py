@@ -0,0 +1,101 @@
+'''
+Times saving and loading a scale library of synthetic families as the QSettings array of earlier versions and as
+a scalelibrary file, and saving a change of one family by writing the library again and through its journal:
+
+    python benchmarks/librarybench.py --families 20000
+
+The families are the 2048 pitch class sets that have the root, repeated with new names.
+'''
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QSettings
+
+from scalelibrary import appendJournal, loadLibrary, packJournalRecord, saveLibrary
+
+
+def syntheticScales(numOfFamilies):
+    scales = {}
+    for indx in range(numOfFamilies):
+        mask = ((indx % 2048) << 1) | 1
+        tones = [tone for tone in range(12) if mask >> tone & 1] + [12]
+        intervals = [upper - lower for lower, upper in zip(tones, tones[1:])]
+        scales[f"Family {indx}"] = [intervals, [f"Mode {modeIndx + 1} of {indx % 2048}"
+                                                for modeIndx in range(len(intervals))]]
+    return scales
+
+
+def settingsArray(fileName, scales):
+    # the writeSettings and readSettings code of earlier versions
+    settings = QSettings(fileName, QSettings.Format.IniFormat)
+    t0 = time.perf_counter()
+    settings.beginGroup("scale")
+    settings.beginWriteArray("scales")
+    for i, akey in enumerate(scales):
+        settings.setArrayIndex(i)
+        settings.setValue("scaleName", akey)
+        settings.setValue("intervals", json.dumps(scales[akey][0]))
+        settings.setValue("modes", json.dumps(scales[akey][1]))
+    settings.endArray()
+    settings.endGroup()
+    settings.sync()
+    t1 = time.perf_counter()
+    settings = QSettings(fileName, QSettings.Format.IniFormat)
+    settings.beginGroup("scale")
+    numScales = settings.beginReadArray("scales")
+    loaded = {}
+    for i in range(numScales):
+        settings.setArrayIndex(i)
+        name = settings.value("scaleName")
+        modes = json.loads(settings.value("modes"))
+        intervals = json.loads(settings.value("intervals"))
+        loaded[name] = [intervals, modes]
+    settings.endArray()
+    settings.endGroup()
+    t2 = time.perf_counter()
+    assert loaded == scales
+    return t1 - t0, t2 - t1
+
+
+def libraryFile(fileName, scales):
+    t0 = time.perf_counter()
+    saveLibrary(fileName, scales)
+    t1 = time.perf_counter()
+    loaded = loadLibrary(fileName)
+    t2 = time.perf_counter()
+    assert loaded == scales
+    return t1 - t0, t2 - t1
+
+
+def oneFamilyChange(fileName, scales):
+    changed = dict(scales)
+    changed["Family 0"] = [[2, 2, 1, 2, 2, 2, 1], ["Ionian"] * 7]
+    t0 = time.perf_counter()
+    saveLibrary(fileName, changed)
+    t1 = time.perf_counter()
+    appendJournal(fileName, packJournalRecord({"Family 0": changed["Family 0"]}))
+    t2 = time.perf_counter()
+    assert loadLibrary(fileName) == changed
+    return t1 - t0, t2 - t1
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time saving and loading a scale library.")
+    parser.add_argument("--families", help="number of scale families", type=int, default=20000)
+    cmdargs = parser.parse_args()
+    scales = syntheticScales(cmdargs.families)
+    with tempfile.TemporaryDirectory() as tmpDir:
+        for label, fileName, method in (("QSettings array", os.path.join(tmpDir, "scales.conf"), settingsArray),
+                                        ("scale library", os.path.join(tmpDir, "scales.scales"), libraryFile)):
+            saveTime, loadTime = method(fileName, scales)
+            print(f"{label:16} {cmdargs.families} families: save {1000 * saveTime:8.1f} ms, "
+                  f"load {1000 * loadTime:8.1f} ms, {os.path.getsize(fileName) / 1024:8.0f} KiB")
+        rewriteTime, journalTime = oneFamilyChange(os.path.join(tmpDir, "change.scales"), scales)
+        print(f"one family changed: library written {1000 * rewriteTime:8.1f} ms, "
+              f"journal appended {1000 * journalTime:8.1f} ms")
@@ -0,0 +1,63 @@
+'''
+Times the redraws of the main window (MainWindow.drawScale) while stepping the primary scale through every
+mode x key, at a logging level:
+
+    python benchmarks/redrawbench.py --log_level INFO --repeat 3
+    python benchmarks/redrawbench.py --log_level DEBUG --tfunc layoutGrphTxtItems
+
+The log output goes to os.devnull so only the cost of the logging calls is timed.  Run it offscreen
+(QT_QPA_PLATFORM=offscreen) on two commits to compare them.
+'''
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtWidgets import QApplication
+
+import scalesmithy
+from logutils import parse_args, setup_logger
+from scalecore import allKeys, ChordLevel
+
+
+def run(window, repeat):
+    '''returns the ms of every redraw'''
+    times = []
+    scale = window.primaryScale
+    for arun in range(repeat):
+        for amode in scale.modes:
+            scale.mode = amode
+            for akey in allKeys[1:]:
+                scale.key = akey
+                t0 = time.perf_counter()
+                window.drawScale()
+                times.append(1000 * (time.perf_counter() - t0))
+    return times
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time the main window redraws at a logging level.")
+    parser.add_argument("--log_level", help="the logging level: INFO, DEBUG, ...", default="INFO")
+    parser.add_argument("--tfunc", help="only log the debug messages of this function", default=None)
+    parser.add_argument("--level", help="ChordLevel name", default="ALL")
+    parser.add_argument("--repeat", help="number of passes over the modes and keys", type=int, default=3)
+    cmdargs = parser.parse_args()
+    app = QApplication.instance() or QApplication([])
+    window = scalesmithy.MainWindow(parse_args([]))
+    window.chordNameLevel = ChordLevel[cmdargs.level]
+    window.chorder.chordLevel = window.chordNameLevel
+    stderr = sys.stderr
+    with open(os.devnull, "w") as devnull:
+        sys.stderr = devnull
+        setup_logger(log_level=cmdargs.log_level, filter_params={"tfunc": cmdargs.tfunc})
+        try:
+            times = run(window, cmdargs.repeat)
+        finally:
+            sys.stderr = stderr
+            logging.getLogger().setLevel(logging.WARNING)
+    print(f"{cmdargs.log_level} {cmdargs.level}: {len(times)} redraws, median {statistics.median(times):.3f} ms, "
+          f"mean {statistics.fmean(times):.3f} ms, total {sum(times):.0f} ms")
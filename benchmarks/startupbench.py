@@ -0,0 +1,71 @@
+'''
+Times the startup of scalesmithy, from launching the interpreter to the main window shown with the
+event loop running, and checks it against a budget:
+
+    python benchmarks/startupbench.py --repeat 5 --budget 400
+
+Each run is a fresh `python -c` process so nothing is cached in memory.  The run fails (exit status 1)
+if the median startup is over the budget or if a module that should only be imported when first used
+(printing, MIDI, MIDI file export) was imported at startup.  Run it offscreen (QT_QPA_PLATFORM=offscreen)
+on two commits to compare them.
+'''
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+rootDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules that are imported when the feature using them is first used
+lazyModules = ['PyQt6.QtPrintSupport', 'mido', 'midiexport', 'concurrent.futures.process', 'poetry']
+
+startupScript = f'''
+import json, sys, time
+t0 = time.monotonic()
+import scalesmithy
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+t1 = time.monotonic()
+app = QApplication([])
+window = scalesmithy.MainWindow(scalesmithy.parse_args([]))
+window.show()
+shown = []
+QTimer.singleShot(0, lambda: (shown.append(time.monotonic()), app.quit()))
+app.exec()
+print(json.dumps({{"imported": t0, "importTime": t1 - t0, "shown": shown[0],
+                  "lazyLoaded": [name for name in {lazyModules!r} if name in sys.modules]}}))
+'''
+
+
+def startupOnce():
+    '''returns the stats of one startup, times in seconds from the launch of the process'''
+    launched = time.monotonic()
+    result = subprocess.run([sys.executable, "-c", startupScript], cwd=rootDir, capture_output=True, text=True,
+                            check=True)
+    # time.monotonic() is the same clock in the child process
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+    return {'interpreter': stats['imported'] - launched,
+            'imports': stats['importTime'],
+            'firstFrame': stats['shown'] - launched,
+            'lazyLoaded': stats['lazyLoaded']}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time the startup of scalesmithy against a budget.")
+    parser.add_argument("--repeat", help="number of startups, the median is checked", type=int, default=5)
+    parser.add_argument("--budget", help="startup budget in ms, launch to first frame", type=float, default=400)
+    cmdargs = parser.parse_args()
+    runs = [startupOnce() for arun in range(cmdargs.repeat)]
+    firstFrame = 1000 * statistics.median(run['firstFrame'] for run in runs)
+    imports = 1000 * statistics.median(run['imports'] for run in runs)
+    interpreter = 1000 * statistics.median(run['interpreter'] for run in runs)
+    lazyLoaded = sorted({name for run in runs for name in run['lazyLoaded']})
+    print(f"startup to first frame {firstFrame:.0f} ms (budget {cmdargs.budget:.0f} ms): "
+          f"interpreter {interpreter:.0f} ms, imports {imports:.0f} ms, "
+          f"window {firstFrame - interpreter - imports:.0f} ms, median of {cmdargs.repeat}")
+    if lazyLoaded:
+        print(f"imported at startup but should be lazy: {', '.join(lazyLoaded)}")
+    sys.exit(1 if firstFrame > cmdargs.budget or lazyLoaded else 0)
@@ -5,6 +5,10 @@ class SpecificLogFilter(logging.Filter):
     def __init__(self, target_name=None, target_func=None, target_lines=None):
         """
         A filter to only allow logs from specified classes, methods, or line numbers.
+        Note: a logging.Filter is called after the LogRecord is built, so a debug call that is filtered out
+        still costs the record.  Only the level checks (logger.isEnabledFor guards and the --tname levels
+        set by setup_logger) skip a call before that; filtering by function and line before the record
+        would need another Logger class and is not done.
 
         Args:
             target_class (str): The name of the target class to log (optional).
@@ -32,14 +36,23 @@ class SpecificLogFilter(logging.Filter):
         return True  # Allow this log record
 
 
+# loggers of the scalesmithy modules, the --tfunc/--tlines filter is added to them and not to the
+# loggers of PyQt6, mido and other libraries
+APP_LOGGERS = ("__main__", "scalesmithy", "scalecore", "scalematrix", "musicalclasses", "utils", "textlayout",
+               "midiplayer", "midiexport", "scalelibrary", "scaleimport", "settingsstore", "startupprofile",
+               "logutils")
 
 
-# Import your Python classes or modules here
-# Example: from your_module import YourClass
+# name of the console handler setup_logger adds to the root logger
+CONSOLE_HANDLER_NAME = "scalesmithy-console"
+
 
 def setup_logger(log_level=logging.DEBUG, filter_params={}):
     """
-    Sets up the logger with optional custom filtering.
+    Sets up the logger with optional custom filtering.  It can be called more than once, the console
+    handler added by an earlier call is set up again instead of adding another one.
+    With a "tname" module the other scalesmithy loggers are set to INFO, so their debug calls are skipped
+    by the level check before a record is built.  The "tfunc" and "tlines" filters run on the built records.
 
     Args:
         log_level (int): Global logging level.
@@ -49,9 +62,23 @@ def setup_logger(log_level=logging.DEBUG, filter_params={}):
     logger.setLevel(log_level)
 
     # Console handler for log output
-    console_handler = logging.StreamHandler()
+    console_handler = next((handler for handler in logger.handlers if handler.get_name() == CONSOLE_HANDLER_NAME),
+                           None)
+    if console_handler is None:
+        console_handler = logging.StreamHandler()
+        console_handler.set_name(CONSOLE_HANDLER_NAME)
+        # Add the handler to the logger
+        logger.addHandler(console_handler)
     console_handler.setLevel(log_level)
-
+    app_loggers = [logging.getLogger(name) for name in APP_LOGGERS]
+    target_name = filter_params.get("tname")
+    for a_logger in app_loggers:
+        if target_name and a_logger.name != target_name and logger.getEffectiveLevel() < logging.INFO:
+            a_logger.setLevel(logging.INFO)
+        else:
+            a_logger.setLevel(logging.NOTSET)
+        for old_filter in [a_filter for a_filter in a_logger.filters if isinstance(a_filter, SpecificLogFilter)]:
+            a_logger.removeFilter(old_filter)
 
     # Create a custom log filter and apply it based on arguments
     if filter_params:
@@ -60,7 +87,8 @@ def setup_logger(log_level=logging.DEBUG, filter_params={}):
                 target_func=filter_params.get("tfunc"),
                 target_lines=filter_params.get("tlines")
         )
-        console_handler.addFilter(log_filter)
+        for a_logger in app_loggers:
+            a_logger.addFilter(log_filter)
 
     # Simple log formatting
     console_formatter = logging.Formatter(
@@ -68,16 +96,18 @@ def setup_logger(log_level=logging.DEBUG, filter_params={}):
     )
     console_handler.setFormatter(console_formatter)
 
-    # Add the handler to the logger
-    logger.addHandler(console_handler)
-
     return logger
 
-def parse_args():
+def parse_args(argv=None):
+    """Parses argv, default sys.argv[1:]"""
     parser = argparse.ArgumentParser(description="Control specific logging at runtime.")
     parser.add_argument("--log_level", help="The logging level: INFO, DEBUG, CRITICAL, ...", type=str, default=logging.INFO)
     parser.add_argument("--tname", help="The name of the logger (module) for which to log debug messages.", type=str,
                         default=None)
     parser.add_argument("--tfunc", help="The function or method name for which to log debug messages.", type=str, default=None)
     parser.add_argument("--tlines", help="Comma-separated list of line numbers to log.", type=str, default=None)
-    return parser.parse_args()
+    parser.add_argument("--layout_cache", help="File the solved chord text layouts are loaded from and saved to.",
+                        type=str, default=None)
+    parser.add_argument("--profile-startup", help="Write the import times, startup phases and time to the first paint "
+                        "as JSON to this file (- for stdout) and quit.", type=str, default=None, metavar="FILE")
+    return parser.parse_args(argv)
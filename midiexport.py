@@ -0,0 +1,131 @@
+'''
+midiexport renders scale MidiPatterns to Standard MIDI Files with mido.MidiFile, without a MIDI port
+and without waiting out the tempo.  A whole scale library can be written at once, spread over the
+CPU cores with a process pool:
+
+    python midiexport.py SavedScales/myScales.json practice/ --tempo 90 --octaves 2
+
+writes one .mid file per family x mode x key x pattern.
+'''
+import argparse
+import json
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import mido
+
+from midiplayer import scheduleNotes
+from scalecore import allKeys, MidiPattern, ScaleModel
+
+logger = logging.getLogger(__name__)
+
+# the single patterns a library is exported with
+exportPatterns = [apattern for apattern in MidiPattern if apattern != MidiPattern.NONE]
+
+
+def eventsToMidiFile(events, tempo, progNum=0, trackName=None, ticksPerBeat=480):
+    '''
+    Returns a mido.MidiFile with one track of the [(seconds from start, mido.Message), ...] events
+    (see midiplayer.scheduleNotes) played at tempo bpm with midi program progNum on channel 0.
+    '''
+    midiTempo = mido.bpm2tempo(tempo)
+    midiFile = mido.MidiFile(ticks_per_beat=ticksPerBeat)
+    track = mido.MidiTrack()
+    if trackName:
+        track.append(mido.MetaMessage('track_name', name=trackName))
+    track.append(mido.MetaMessage('set_tempo', tempo=midiTempo))
+    track.append(mido.Message('program_change', program=progNum, channel=0))
+    lastTick = 0
+    for when, msg in events:
+        # absolute ticks are rounded so the rounding errors do not add up
+        tick = round(mido.second2tick(when, ticksPerBeat, midiTempo))
+        track.append(msg.copy(time=tick - lastTick))
+        lastTick = tick
+    midiFile.tracks.append(track)
+    return midiFile
+
+
+def scaleMidiFile(scale, progNum, tempo, octaves, scalePatterns):
+    '''Returns the mido.MidiFile of scale, a ScaleModel with a key, played like Scale.playScale does'''
+    events = scheduleNotes(scale.noteSequence(octaves, scalePatterns), 60 / tempo)
+    return eventsToMidiFile(events, tempo, progNum, trackName=plainName(f"{scale.name} {scale.mode} {scale.key}"))
+
+
+def plainName(name):
+    '''name without html and with # and b for sharp and flat, EX: C<sup>#</sup>/D<sup>♭</sup> -> C#/Db'''
+    return re.sub(r'<[^>]+>', '', name).replace('♯', '#').replace('♭', 'b')
+
+
+def midiFileName(family, mode, key, scalePattern):
+    name = plainName(f"{family}_{mode}_{key}_{scalePattern.name}")
+    return re.sub(r'[^\w#.-]+', '_', name.replace('/', '-')) + '.mid'
+
+
+def _exportFamily(family, scaleDef, outDir, progNum, tempo, octaves, scalePatterns):
+    # process pool worker: writes every mode x key x pattern of a family, returns (written, failed)
+    scale = ScaleModel(family, scaleDef)
+    written = 0
+    failed = []
+    for amode in scaleDef[1]:
+        scale.mode = amode
+        for akey in allKeys[1:]:
+            try:
+                scale.key = akey
+            except Exception as err:
+                failed.append((plainName(f"{family} {amode} {akey}"), str(err)))
+                continue
+            for apattern in scalePatterns:
+                fileName = os.path.join(outDir, midiFileName(family, amode, akey, apattern))
+                try:
+                    scaleMidiFile(scale, progNum, tempo, octaves, apattern).save(fileName)
+                    written += 1
+                except Exception as err:
+                    failed.append((fileName, str(err)))
+    return written, failed
+
+
+def exportLibrary(scales, outDir, progNum=0, tempo=120, octaves=1, scalePatterns=None, processes=None):
+    '''
+    Writes a .mid file for every family x mode x key x pattern of scales ({name: [firstModeIntervals, modes]})
+    to outDir, one family per process pool task.
+    param scalePatterns: the MidiPatterns to export, each on its own, default all of them
+    param processes: number of worker processes, default one per CPU core
+    Returns (number of files written, [(file name, error), ...]).
+    '''
+    if scalePatterns is None:
+        scalePatterns = exportPatterns
+    os.makedirs(outDir, exist_ok=True)
+    written = 0
+    failed = []
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(_exportFamily, family, scales[family], outDir, progNum, tempo, octaves, scalePatterns)
+                   for family in scales]
+        for future in futures:
+            familyWritten, familyFailed = future.result()
+            written += familyWritten
+            failed.extend(familyFailed)
+    for fileName, err in failed:
+        logger.warning(f"{fileName} not written: {err}")
+    return written, failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Write every family x mode x key x MidiPattern of a scale file as .mid files.")
+    parser.add_argument("scalefile", help="JSON scale file as written by File->Save")
+    parser.add_argument("outdir", help="directory the .mid files are written to")
+    parser.add_argument("--tempo", help="tempo in bpm", type=int, default=120)
+    parser.add_argument("--octaves", help="number of octaves, 1 to 3", type=int, default=1)
+    parser.add_argument("--program", help="midi program (instrument) number", type=int, default=0)
+    parser.add_argument("--patterns", help="comma separated MidiPattern names, default all", type=str, default=None)
+    parser.add_argument("--processes", help="number of worker processes, default one per CPU core", type=int,
+                        default=None)
+    cmdargs = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    with open(cmdargs.scalefile, "r") as fp:
+        catalog = json.load(fp)
+    patterns = [MidiPattern[name.strip()] for name in cmdargs.patterns.split(",")] if cmdargs.patterns else None
+    numWritten, failed = exportLibrary(catalog, cmdargs.outdir, cmdargs.program, cmdargs.tempo, cmdargs.octaves,
+                                          patterns, cmdargs.processes)
+    print(f"{numWritten} MIDI files written to {cmdargs.outdir}, {len(failed)} failed")
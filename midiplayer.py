@@ -0,0 +1,251 @@
+'''
+midiplayer plays note sequences to a mido output port on its own thread so the GUI stays
+responsive while a scale is playing.  A sequence is turned into a list of events at absolute times from
+the start, and each event is sent at its time.monotonic() deadline by sleeping until just before it and
+spinning the rest, so the tempo does not drift with the send and Python overhead.  The playback can be
+paused, resumed and stopped from the GUI thread.  Progress and the end of the playback are reported
+through callbacks that are called on the player thread.
+mido is imported when the first events are built or a port is opened, not when the module is imported.
+'''
+import logging
+import statistics
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def scheduleNotes(notes, noteDuration, gate=1.0, channel=0, velocity=127):
+    '''
+    Returns the [(seconds from start, mido.Message), ...] event list, in time order, of notes played one
+    after the other.
+    param notes: midi note numbers
+    param noteDuration: seconds from one note to the next
+    param gate: note length as a fraction of noteDuration, more than 1 overlaps the next note (legato)
+    '''
+    import mido
+    events = []
+    for indx, midiNote in enumerate(notes):
+        # the times are step counts times noteDuration, so with gate 1 a note_off is at exactly the time of
+        # the next note_on, start + gate * noteDuration can round to 1 ulp after it and cut the next note
+        events.append((indx * noteDuration, 1,
+                       mido.Message('note_on', channel=channel, note=midiNote, velocity=velocity)))
+        events.append(((indx + gate) * noteDuration, 0,
+                       mido.Message('note_off', channel=channel, note=midiNote, velocity=0)))
+    # at the same time the note_offs go first so a repeated note is played again
+    events.sort(key=lambda event: event[:2])
+    return [(when, msg) for when, order, msg in events]
+
+
+def scheduleChords(chords, chordDuration, broken=0.0, channels=(0,), gate=1.0, velocity=127):
+    '''
+    Returns the event list, like scheduleNotes, of chords (tuples of midi note numbers) played one after the other.
+    param broken: seconds from one note of a chord to the next, 0 plays block chords
+    param channels: note i of a chord is sent on channels[i % len(channels)]
+    param gate: chord length as a fraction of chordDuration
+    '''
+    import mido
+    events = []
+    for indx, chord in enumerate(chords):
+        # step counts times chordDuration, like scheduleNotes
+        start = indx * chordDuration
+        end = (indx + gate) * chordDuration
+        for toneIndx, midiNote in enumerate(chord):
+            channel = channels[toneIndx % len(channels)]
+            events.append((start + toneIndx * broken, 1,
+                           mido.Message('note_on', channel=channel, note=midiNote, velocity=velocity)))
+            events.append((end, 0, mido.Message('note_off', channel=channel, note=midiNote, velocity=0)))
+    events.sort(key=lambda event: event[:2])
+    return [(when, msg) for when, order, msg in events]
+
+
+def jitterStats(lateness):
+    '''mean, max and standard deviation in ms of the send lateness (seconds) of the events'''
+    if not lateness:
+        return {'events': 0, 'mean': 0.0, 'max': 0.0, 'stdev': 0.0}
+    return {'events': len(lateness),
+            'mean': 1000 * statistics.fmean(lateness),
+            'max': 1000 * max(lateness),
+            'stdev': 1000 * statistics.pstdev(lateness)}
+
+
+class MidiPlayer:
+    '''
+    Plays one event list at a time.  jitter has the jitterStats of the last playback.
+    param progress: called with (notes started, number of notes) after each note_on
+    param finished: called when a playback ends, stopped or not
+    param spinTime: seconds before a deadline the player stops sleeping and spins
+    '''
+    def __init__(self, progress=None, finished=None, spinTime=0.002):
+        self.progress = progress
+        self.finished = finished
+        self.spinTime = spinTime
+        self.jitter = jitterStats([])
+        self._thread = None
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._paused = False
+
+    @property
+    def isPlaying(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def isPaused(self):
+        return self._paused
+
+    def play(self, port, notes, noteDuration, closePort=False, gate=1.0):
+        '''
+        Starts playing notes, a list of midi note numbers, noteDuration seconds apart.
+        See scheduleNotes for gate.
+        '''
+        self.playEvents(port, scheduleNotes(notes, noteDuration, gate), closePort)
+
+    def playEvents(self, port, events, closePort=False):
+        '''
+        Starts sending the [(seconds from start, mido.Message), ...] events, in time order, to port.
+        A playback that is still running is stopped first.
+        param closePort: close port when the playback ends
+        '''
+        self.stop()
+        self._stopping = False
+        self._paused = False
+        self._thread = threading.Thread(target=self._run, args=(port, events, closePort),
+                                        name="MidiPlayer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        '''stops the playback and waits for the player thread to end, a paused playback is not paused any more'''
+        with self._cond:
+            self._paused = False
+            if self._thread is None:
+                return
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._thread = None
+
+    def pause(self):
+        with self._cond:
+            self._paused = True
+
+    def resume(self):
+        with self._cond:
+            self._paused = False
+            self._cond.notify_all()
+
+    def _waitUntil(self, deadline):
+        # sleeps until spinTime before the monotonic deadline and spins the rest,
+        # returns False if stopped or paused on the way
+        with self._cond:
+            self._cond.wait_for(lambda: self._stopping or self._paused,
+                                deadline - self.spinTime - time.monotonic())
+            if self._stopping or self._paused:
+                return False
+        while time.monotonic() < deadline:
+            pass
+        return True
+
+    def _waitWhilePaused(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self._stopping or not self._paused)
+            return not self._stopping
+
+    def _run(self, port, events, closePort):
+        import mido
+        numOfNotes = sum(1 for when, msg in events if msg.type == 'note_on')
+        notesStarted = 0
+        sounding = set()
+        lateness = []
+        try:
+            start = time.monotonic()
+            indx = 0
+            while indx < len(events):
+                when, msg = events[indx]
+                if not self._waitUntil(start + when):
+                    # silence the playing notes while paused or when stopped
+                    for channel, midiNote in sounding:
+                        port.send(mido.Message('note_off', channel=channel, note=midiNote, velocity=0))
+                    sounding.clear()
+                    pausedAt = time.monotonic()
+                    if not self._waitWhilePaused():
+                        break
+                    start += time.monotonic() - pausedAt
+                    continue
+                # the events at the same time, like the notes of a block chord, are sent in one burst
+                late = time.monotonic() - start - when
+                started = notesStarted
+                while indx < len(events) and events[indx][0] == when:
+                    msg = events[indx][1]
+                    port.send(msg)
+                    lateness.append(late)
+                    if msg.type == 'note_on':
+                        sounding.add((msg.channel, msg.note))
+                        notesStarted += 1
+                    elif msg.type == 'note_off':
+                        sounding.discard((msg.channel, msg.note))
+                    indx += 1
+                if self.progress and notesStarted > started:
+                    self.progress(notesStarted, numOfNotes)
+        except Exception as err:
+            logger.error(f"MIDI playback failed: {err}")
+        finally:
+            self.jitter = jitterStats(lateness)
+            logger.info(f"MIDI playback jitter: {self.jitter}")
+            if closePort:
+                port.close()
+            if self.finished:
+                self.finished()
+
+
+class MidiPorts:
+    '''
+    The open mido output ports, by name.  A port stays open between playbacks so the first note is not
+    delayed by opening the device, and a program_change is only sent when the program of a channel changes.
+    '''
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ports = {}
+        self._programs = {}
+
+    def __contains__(self, name):
+        return name in self._ports
+
+    def get(self, name):
+        '''returns the open port name, opening it if needed.  Raises the mido error if it can not be opened'''
+        with self._lock:
+            port = self._ports.get(name)
+            if port is None or port.closed:
+                import mido
+                port = mido.open_output(name)
+                self._ports[name] = port
+                self._programs[name] = {}
+                logger.info(f"MIDI port {name} opened")
+            return port
+
+    def reopen(self, name):
+        '''closes and opens name again, for example after the device was reconnected'''
+        self.close(name)
+        return self.get(name)
+
+    def setProgram(self, name, program, channel=0):
+        '''sends a program_change to channel of port name unless it already has program'''
+        port = self.get(name)
+        with self._lock:
+            if self._programs[name].get(channel) == program:
+                return
+            import mido
+            port.send(mido.Message('program_change', program=program, channel=channel))
+            self._programs[name][channel] = program
+
+    def close(self, name):
+        with self._lock:
+            port = self._ports.pop(name, None)
+            self._programs.pop(name, None)
+        if port is not None:
+            port.close()
+            logger.info(f"MIDI port {name} closed")
+
+    def closeAll(self):
+        for name in list(self._ports):
+            self.close(name)
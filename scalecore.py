@@ -0,0 +1,672 @@
+'''
+scalecore contains the pure python musical model behind Scale Smithy: scale families,
+mode rotation, note naming, chord detection and the pitch class scale index.
+It has no PyQt dependency so it can be used by batch jobs and worker processes
+without a display.
+'''
+import logging
+import re
+from collections import deque, namedtuple
+from enum import Enum, Flag, auto
+from functools import lru_cache
+from itertools import accumulate
+
+logger = logging.getLogger(__name__)
+
+sharp = '<sup>#</sup>'
+flat = '<sup>♭</sup>'
+
+allKeys = ["None", "C", "C" + sharp + '/D' + flat, "D", "D" + sharp + "/E" + flat, "E", "F",
+           "F" + sharp + "/G" + flat, "G", "G" + sharp + "/A" + flat, "A", "A" + sharp + "/B" + flat, "B"]
+
+romanNumerals = ['I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX', 'X', 'XI', 'XII']
+
+
+class ChordLevel(Enum):
+    OFF = 0
+    BASIC_ACCORD = 1
+    ADV_ACCORD = 2
+    ALL = 3
+
+
+class ChordSymbol(Enum):
+    RAW = 0
+    JAZZ = 1
+    COMMON = 2
+
+
+class MidiPattern(Flag):
+    # supports: opts = MidiPattern.LINEAR_UP | MidiPattern.LINEAR_DOWN; MidiPattern.PATTERN_UP in opts
+    NONE = auto()
+    LINEAR_UP = auto()
+    LINEAR_DOWN = auto()
+    PATTERN_UP = auto()
+    PATTERN_DOWN = auto()
+    ARPEGGIO_UP = auto()
+    ARPEGGIO_DOWN = auto()
+
+
+class ChordPlay(Enum):
+    # how the chords of the scale degrees are played, OFF plays the MidiPatterns
+    OFF = 0
+    BLOCK = 1
+    BROKEN = 2
+
+
+def Cumulative(lists):
+    '''running sums of lists: [a, b, c] -> [a, a+b, a+b+c]'''
+    return list(accumulate(lists))
+
+
+def rotationPositions(intervals):
+    '''
+    Returns a tuple with one entry per rotation of intervals.  Entry r holds the semitone positions
+    (0, ..., octave) of the scale tones when the intervals are rotated left by r, which are the
+    positions relative to scale degree r + 1 of the first mode.  The tables of the last
+    rotationCacheSize interval patterns are kept, shared by all scales of a family.
+    '''
+    return _rotationPositions(tuple(intervals))
+
+
+# interval patterns whose rotation tables are kept
+rotationCacheSize = 1024
+
+
+@lru_cache(maxsize=rotationCacheSize)
+def _rotationPositions(intervals):
+    return tuple(tuple(Cumulative((0,) + intervals[r:] + intervals[:r])) for r in range(len(intervals)))
+
+
+def degreeSequence(numOfDegrees, octaves, scalePatterns):
+    '''
+    Returns the scale degree indexes played for scalePatterns (MidiPattern flags) in the order of the
+    MidiPattern members.  0 is the root, numOfDegrees the root an octave up.  The thirds and arpeggios
+    of the top degrees go above the top root.
+    '''
+    top = numOfDegrees * octaves
+    up = range(top + 1)
+    down = range(top, -1, -1)
+    degrees = []
+    if MidiPattern.LINEAR_UP in scalePatterns:
+        degrees.extend(up)
+    if MidiPattern.LINEAR_DOWN in scalePatterns:
+        degrees.extend(down)
+    if MidiPattern.PATTERN_UP in scalePatterns:
+        for deg in up:
+            degrees.extend((deg, deg + 2) if deg < top else (deg,))
+    if MidiPattern.PATTERN_DOWN in scalePatterns:
+        for deg in down:
+            degrees.extend((deg + 2, deg))
+    if MidiPattern.ARPEGGIO_UP in scalePatterns:
+        for deg in up:
+            degrees.extend((deg, deg + 2, deg + 4))
+    if MidiPattern.ARPEGGIO_DOWN in scalePatterns:
+        for deg in down:
+            degrees.extend((deg + 4, deg + 2, deg))
+    return degrees
+
+
+def noteSequence(semitonePositions, keyNum, octaves, scalePatterns):
+    '''
+    Returns the tuple of midi note numbers played for scalePatterns from keyNum over octaves.
+    semitonePositions are the (0, ..., octave) positions of the mode, see ScaleModel.noteSemitonePositions.
+    The last noteSequenceCacheSize sequences are kept and shared by playback and file export.
+    '''
+    return _noteSequence(tuple(semitonePositions), keyNum, octaves, scalePatterns)
+
+
+# (semitone positions, key midi number, octaves, MidiPattern flags) sequences kept
+noteSequenceCacheSize = 1024
+
+
+@lru_cache(maxsize=noteSequenceCacheSize)
+def _noteSequence(semitonePositions, keyNum, octaves, scalePatterns):
+    numOfDegrees = len(semitonePositions) - 1
+    return tuple(keyNum + 12 * (deg // numOfDegrees) + semitonePositions[deg % numOfDegrees]
+                 for deg in degreeSequence(numOfDegrees, octaves, scalePatterns))
+
+
+class ScaleModel:
+    '''
+    The scale model holds the data and calculations for a particular scale family with
+    variable mode and key signature, without any drawing.
+    param name:  The name of the scale family
+    param scaleDef: A two element list containing:
+                                firstModeIntervals in scaledef[0]
+                                list of mode names in scaleDef[1]
+
+    Note: firstModeIntervals are the intervals for the first (0 index) mode in semitones between the
+          root tone - > 2nd scale degree,   2nd scale degree -> 3rd,
+          3rd -> 4th, .... last scale degree -> root.  If there are 7 notes in a
+          scale then there will be 7 intervals.  For octave scales the sum of the intervals = 12
+          EX: Diatonic: Ionion mode (Maj): [2, 2, 1, 2, 2, 2, 1]
+    '''
+    allKeys = allKeys
+    noteMidiNum = dict(zip(allKeys, [0, 60, 61, 62, 63, 64, 65, 66, 67, 68, 69, 70, 71]))
+
+    def __init__(self, name, scaleDef):
+        self.name = name
+        logger.info(f"Scale created: {name}")
+        logger.debug(scaleDef)
+        self.modes = scaleDef[1]
+        self.firstModeIntervals = scaleDef[0]
+        self.modeIndx = 0
+        self._key = None
+        self._noteSemitonePositions = []
+        self._notes = []
+        self.CalculateModeNotePositions()
+        self.CalculateNoteNames()
+
+    @property
+    def firstModeIntervals(self):
+        return self._firstModeIntervals
+
+    @firstModeIntervals.setter
+    def firstModeIntervals(self, intervals):
+        self._firstModeIntervals = deque(intervals)
+        self._positionsTable = None
+
+    @property
+    def numOfNotes(self):
+        return len(self.firstModeIntervals)
+
+    @property
+    def mode(self):
+        return self.modes[self.modeIndx]
+
+    @mode.setter
+    def mode(self, amode):
+        try:
+            self.modeIndx = self.modes.index(amode)
+        except:
+            logger.warning('Bad mode recalled')
+        self.CalculateModeNotePositions()
+        self.CalculateNoteNames()
+        self.changed()
+
+    @property
+    def key(self):
+        return self._key
+
+    @key.setter
+    def key(self, newKey):
+        if newKey == 'None':
+            self._key = None
+        else:
+            self._key = newKey
+        self.CalculateNoteNames()
+        self.changed()
+
+    @property
+    def notes(self):
+        return self._notes
+
+    @property
+    def noteSemitonePositions(self):
+        return self._noteSemitonePositions
+
+    def changed(self):
+        '''Called after the mode or key changes.  Renderers override this to drop their stale graphics'''
+        pass
+
+    def CalculateModeNotePositions(self):
+        self._noteSemitonePositions = self.getModeDegRelPositions(self.modeIndx)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(" scale index = %s", self._noteSemitonePositions)
+
+    def getModeDegRelPositions(self, modeIndx, scaledeg=1):
+        '''semitone positions of the scale tones relative to scaledeg (1 = root) of mode modeIndx'''
+        if self._positionsTable is None:
+            self._positionsTable = rotationPositions(self._firstModeIntervals)
+        return self._positionsTable[(modeIndx + scaledeg - 1) % self.numOfNotes]
+
+    def CalculateNoteNames(self):
+        """Given the root note the 12 notes are reordered starting with the root note.
+        Note that the first item in allKeys is 'none' that is why allKeys[1:] is
+        used below as it starts with 'C'  """
+        if self._key == "none" or not self._key:
+            # no note was selected for the root, relative scale members will be shown with roman numerals
+            self._notes = romanNumerals[:self.numOfNotes]
+        else:
+            # construct a chromatic list of 12 notes starting with the root
+            offset = allKeys[1:].index(self._key)
+            self._notes = [allKeys[1:][(i + offset) % len(allKeys[1:])] for i, x in
+                           enumerate(allKeys[1:])]
+            self._notes = [self.notes[i] for i in self._noteSemitonePositions[:-1]]
+
+    def noteSequence(self, octaves, scalePatterns):
+        '''
+        Returns the tuple of midi note numbers to play for the scalePatterns (MidiPattern flags) over octaves
+        '''
+        return noteSequence(self._noteSemitonePositions, self.noteMidiNum[self.key], octaves, scalePatterns)
+
+    def degreeChordNotes(self, level):
+        '''
+        Returns a tuple of midi note numbers for each scale degree, the tones of the first chord of level
+        (ChordLevel other than OFF) that fits at the degree or the degree note alone if none does.
+        '''
+        keyNum = self.noteMidiNum[self.key]
+        chords = []
+        for deg in range(self.numOfNotes):
+            degreeMask = tonePositionsMask(self.getModeDegRelPositions(self.modeIndx, deg + 1))
+            tones = next((chdTones for chdMask, chdTones in chordToneTables[level] if chdMask & degreeMask == chdMask),
+                         (0,))
+            degreeNum = keyNum + self._noteSemitonePositions[deg]
+            chords.append(tuple(degreeNum + tone for tone in tones))
+        return chords
+
+
+# pitch class (semitones above C) of each note name that can be typed in
+notePitchClasses = {'C': 0, 'C#': 1, 'Db': 1, 'D': 2, 'D#': 3, 'Eb': 3, 'E': 4, 'F': 5, 'F#': 6, 'Gb': 6,
+                    'G': 7, 'G#': 8, 'Ab': 8, 'A': 9, 'A#': 10, 'Bb': 10, 'B': 11}
+
+ScaleMatch = namedtuple('ScaleMatch', ['family', 'mode', 'key', 'extraNotes'])
+
+
+def splitNotes(notes):
+    '''
+    Returns the note names of a string of note names separated by spaces or commas, the first letter of each
+    made upper case.  EX: 'c, eb g,' -> ['C', 'Eb', 'G']
+    '''
+    return [anote[:1].upper() + anote[1:] for anote in re.split(r'[\s,]+', notes) if anote]
+
+
+def unknownNotes(notes):
+    '''returns the note names of notes (list or string) that are not in notePitchClasses'''
+    if isinstance(notes, str):
+        notes = splitNotes(notes)
+    return [anote for anote in notes if anote not in notePitchClasses]
+
+
+def notesToMask(notes):
+    '''
+    Returns the absolute 12 bit pitch class mask (bit 0 = C) of a list of note names
+    or a string of note names separated by spaces or commas. EX: 'C E G' -> 0b10010001
+    Raises ValueError if a note name is not known.
+    '''
+    if isinstance(notes, str):
+        notes = splitNotes(notes)
+    unknown = unknownNotes(notes)
+    if unknown:
+        raise ValueError(f"unknown note names: {' '.join(unknown)}")
+    mask = 0
+    for anote in notes:
+        mask |= 1 << notePitchClasses[anote]
+    return mask
+
+
+def rotateMask(mask, semitones):
+    '''rotates a 12 bit pitch class mask down by semitones, so bit semitones becomes bit 0'''
+    semitones %= 12
+    return ((mask >> semitones) | (mask << (12 - semitones))) & 0xFFF
+
+
+def pitchClassMask(intervals):
+    '''
+    Returns the 12 bit pitch class mask of a scale given its intervals.  Bit 0 is the root,
+    bit n is set when the note n semitones above the root is a scale member.
+    EX: Diatonic Ionian [2, 2, 1, 2, 2, 2, 1] -> 0b101010110101
+    '''
+    mask = 1
+    pos = 0
+    for anInterval in list(intervals)[:-1]:
+        pos += anInterval
+        mask |= 1 << (pos % 12)
+    return mask
+
+
+class ScaleIndex:
+    '''
+    ScaleIndex maps the pitch class mask of every mode of every known scale family
+    to the (family, mode) pairs that have those notes.  It is built once from the scale
+    dict and kept up to date with add/remove so that finding a scale is a single dict lookup.
+    param scales: dict of scale families  {name: [firstModeIntervals, modes]}
+    '''
+
+    def __init__(self, scales=None):
+        self._masks = {}
+        self._familyMasks = {}
+        if scales:
+            self.rebuild(scales)
+
+    def rebuild(self, scales):
+        self._masks = {}
+        self._familyMasks = {}
+        for name in scales:
+            self.add(name, scales[name])
+
+    def add(self, name, scaleDef):
+        '''Adds (or replaces) the scale family name.  Only octave scales (intervals sum to 12) are indexed'''
+        self.remove(name)
+        intervals = list(scaleDef[0])
+        if sum(intervals) != 12:
+            logger.debug(f"{name} is not an octave scale and is not indexed")
+            return
+        familyMasks = []
+        for midx, amode in enumerate(scaleDef[1]):
+            mask = pitchClassMask(intervals[midx:] + intervals[:midx])
+            self._masks.setdefault(mask, []).append((name, amode))
+            familyMasks.append(mask)
+        self._familyMasks[name] = familyMasks
+
+    def remove(self, name):
+        for mask in set(self._familyMasks.pop(name, [])):
+            entries = [entry for entry in self._masks[mask] if entry[0] != name]
+            if entries:
+                self._masks[mask] = entries
+            else:
+                del self._masks[mask]
+
+    def find(self, mask):
+        '''returns the list of (family, mode) whose notes relative to the root are exactly mask'''
+        return self._masks.get(mask, [])
+
+    def findAll(self, notesMask, firstNote=None, partial=True):
+        '''
+        Transposition invariant search that does not need to know the root.  All 12 rotations
+        of the notes are tried against the index and every match is returned as a ScaleMatch.
+        param notesMask: absolute pitch class mask of the notes (bit 0 = C), see notesToMask
+        param firstNote: optional pitch class of the first note played, preferred as the root
+        param partial: if True the notes may be a fragment and every scale containing them is returned,
+                       otherwise only scales with exactly these notes are returned
+        Matches are ranked by fewest extra scale notes, then root == firstNote, then root is one of the notes
+        '''
+        numNotes = bin(notesMask).count('1')
+        ranked = []
+        for keyIndx in range(12):
+            relMask = rotateMask(notesMask, keyIndx)
+            if partial:
+                candidates = [amask for amask in self._masks if amask & relMask == relMask]
+            elif relMask in self._masks:
+                candidates = [relMask]
+            else:
+                candidates = []
+            for amask in candidates:
+                extraNotes = bin(amask).count('1') - numNotes
+                rank = (extraNotes, keyIndx != firstNote, not relMask & 1)
+                for family, mode in self._masks[amask]:
+                    ranked.append((rank, ScaleMatch(family, mode, allKeys[keyIndx + 1], extraNotes)))
+        # sort is stable so equal ranks keep the key and scale family order
+        ranked.sort(key=lambda r: r[0])
+        return [amatch for rank, amatch in ranked]
+
+    def findAllMany(self, fragments, partial=True):
+        '''
+        Bulk version of findAll for many note fragments (lists or strings of note names).
+        Returns a list of ScaleMatch lists, one per fragment.  Repeated fragments are only searched once.
+        Raises ValueError if a fragment has no notes or a note name that is not known, check them with
+        unknownNotes first.
+        '''
+        results = []
+        searched = {}
+        for afragment in fragments:
+            if isinstance(afragment, str):
+                afragment = splitNotes(afragment)
+            if not afragment:
+                raise ValueError("a fragment has no notes")
+            searchKey = (notesToMask(afragment), notePitchClasses[afragment[0]])
+            if searchKey not in searched:
+                searched[searchKey] = self.findAll(*searchKey, partial=partial)
+            results.append(searched[searchKey])
+        return results
+
+    def __len__(self):
+        return len(self._masks)
+
+
+# Chord tables: chord tones as semitones above the chord root -> {chord name: [hover text lines]}
+basicChordTypes = {(4, 7, 10): {'7': ['R, sev']},
+                   (4, 7): {'maj': ['R, maj']},
+                   (3, 7): {'min': ['R, min']},
+                   (3, 6): {'dim': ['R, dim']}}
+
+advChordTypes  = {(4, 8): {'aug': ['R-4, sev']}, (2, 7): {'7sus2': ['R, min+1']}}
+
+nydanaIntervals = {(0, 4, 7): {'maj': ['R, maj']},
+                   (0, 3, 7): {'min': ['R, min']},
+                   (0, 4, 7, 10): {'7': ['R, sev']},
+                   (4, 8): {'aug': ['R-4, sev']},
+                   (0, 3, 6): {'dim': ['R, dim', 'R, dim-3', 'R_, dim+1'], 'm(-5)': ['R, dim-3', 'R_, dim+1']},
+                   (0, 2, 7, 10): {'7sus2': ['R, min+1'], '9(≠3)': ['R, min+1']},
+                   (0, 3, 6, 9): {'dim7': ['R, dim-3, dim', 'R_, dim-2, (dim+1)', 'R_, dim-2, (dim-5)']},
+                   (0, 2, 4, 8): {'(+5, 9)': ['R_, sev-4']},
+                   (0, 4, 7, 9): {'6': ['R, min+3, (maj)'], '6/R+4': ['R+4, min-1, (maj-4)'],
+                                  '6/R+7': ['R+7, min+2, (maj-1)'],
+                                  '6/R+9': ['R+9, maj-3, (min)', 'R_+9, maj+1']},
+                   (0, 1, 4, 7, 9): {'6(m9)': ['R, maj+3, (maj)']},
+                   (0, 4, 6, 9): {'6(-5)': ['R_, dim-5, min-5']},
+                   (0, 4, 7, 10): {'7': ['R, sev, (maj)', 'R, dim+1, (maj)'], '7/R+10': ['R+10, maj+2']},
+                   (0, 1, 4, 7, 10): {'7(m9)': ['R, maj, dim-2', 'R, sev, dim-2'],
+                                      '7(m9)/R+10': ['R+10, dim, maj+2']},
+                   (0, 1, 7, 10): {'7(≠3, m9)': ['R, dim-2']},
+                   (0, 3, 4, 7, 10): {'7(m10)': ['R, min, sev', 'R, min, dim+1', 'R, maj-3, sev'],
+                                      '7(m10)/R+7': ['R+7, min-1, dim', 'R+7, min-1, sev-1']},
+                   (0, 4, 9, 10): {'7(13)': ['R, sev, min+3']},
+                   (0, 4, 6, 10): {'7(-5)': ['R, sev-6', 'R_, sev-2']},
+                   (0, 3, 4, 6, 10): {'7(-5, m10)': ['R, dim-3, sev']},
+                   (0, 4, 6, 8, 10): {'7(+5, +11)': ['R, sev-4, sev']},
+
+                   (0, 1, 5, 7, 10): {'7sus4(m9)': ['R, min-2, dim-2'], '11(m9)': ['R, min-2, (dim-2)']},
+                   (0, 2, 4, 7, 10): {'9': ['R, maj, min+1', 'R, sev, min+1', 'R, min+1, dim+1'],
+                                      '9/R+2': ['R+2, maj-2, dim-1'], '9/R+7': ['R+7, min, sev-1']},
+                   (0, 2, 4, 6, 10): {'9(-5)': ['R, sev, sev+2']},
+                   (0, 2, 4, 8, 10): {'9(+5)': ['R, sev-2, sev', 'R_, sev-4, sev+2']},
+                   (0, 2, 8, 10): {'9(≠3, +5)': ['R, sev-2']},
+                   (0, 2, 5, 7, 10): {'9sus4': ['R, maj-2, min+1'], '11': ['R, maj-2, (min+1)']},
+                   (0, 2, 5, 8, 10): {'11(+5)': ['R, maj-2, dim-1', 'R, maj-2, min-1']},
+                   (0, 2, 6, 7, 10): {'11(+11)': ['R, min+1, sev+2']},
+                   (0, 2, 4, 7, 9, 10): {'13': ['R, min+1, min+3'], '13/R+4': ['R+4, min-3, min-1']},
+                   (0, 2, 4, 5, 9, 10): {'13': ['R, sev, min+2']}, (0, 4, 5, 9, 10): {'13': ['R, maj-1, sev']},
+                   (0, 2, 5, 7, 9, 10): {'13(≠3)': ['R, maj-1, min+1', 'R, min+1, min+2']},
+                   (0, 2, 5, 9, 10): {'13(≠3)': ['R, maj-1, maj-2']},
+                   (0, 1, 4, 9, 10): {'13(m9)': ['R, sev, maj+3']},
+                   (0, 2, 4, 6, 9, 10): {'13(+11)': ['R, sev, maj+2']},
+                   (0, 2, 4, 6, 7, 9, 10): {'13(+11)': ['R, dim+1, maj+2']},
+                   (0, 4, 6, 9, 10): {'13(+11)': ['R, sev, dim+3']},
+                   (0, 4, 7, 11): {'maj7': ['R, min+4, (maj)', 'R_, min-4']},
+                   (0, 4, 8, 11): {'maj7(+5)': ['R, maj+4']},
+                   (0, 2, 4, 7, 11): {'maj9': ['R, maj, maj+1', 'R, maj+1, min+4'],
+                                      'maj9/R+2': ['R+2, maj-1, maj-2']},
+                   (0, 2, 7, 11): {'maj9(≠3)': ['R, maj+1']},
+                   (0, 2, 4, 8, 11): {'maj9(+5)': ['R_, maj-4, sev-4', 'R_, sev-4, dim-3']},
+                   (0, 2, 5, 11): {'maj11': ['R, dim+2']}, (0, 2, 5, 7, 11): {'maj11': ['R, maj+1, sev+1']},
+                   (0, 2, 5, 8, 11): {'maj11(+5)': ['R_, dim, (dim-3)', 'R, min-1, dim+2', 'R, dim-1, dim+2']},
+                   (0, 2, 4, 7, 9, 11): {'maj13': ['R, maj+1, min+3']},
+                   (0, 4, 7, 9, 11): {'maj13': ['R_, min-4, min-5']},
+                   (0, 2, 5, 7, 9, 11): {'maj13(≠3)': ['R, maj-1, maj+1']},
+                   (0, 2, 4, 6, 7, 9, 11): {'maj13(+11)': ['R, maj+2, min+4']},
+                   (0, 2, 4, 6, 9, 11): {'maj13(+11)': ['R_, min-5, min-3']},
+                   (0, 1, 3, 7): {'m(m9)': ['R, sev-3, (min)', 'R_, sev+1']},
+                   (0, 3, 6, 8): {'m(-5, m6)': ['R_, maj, sev']},
+                   (0, 2, 3, 6): {'m(-5, 9)': ['R, dim-3, sev+2']},
+                   (0, 3, 8): {'m(+5)': ['R, maj-4', 'R_, maj']},
+                   (0, 3, 7, 9): {'m6': ['R, dim, (min)'], 'm6/R+3': ['R_+3, dim-5, (min-5)'],
+                                  'm6/R+7': ['R+7, dim-1, (min-1)'],
+                                  'm6/R+9': ['R+9, min-3, (dim-3)', 'R_+9, min+1, (dim+1)']},
+                   (0, 1, 3, 7, 9): {'m6(m9)': ['R, min, sev+3']},
+                   (0, 3, 7, 10): {'m7': ['R, maj-3, (min)', 'R_, maj+1'], 'm7/R+10': ['R+10, min+2, (maj-1)']},
+                   (0, 1, 3, 7, 10): {'m7(m9)': ['R, maj-3, sev-3', 'R, sev-3, dim-2', 'R, maj-3, dim-2']},
+                   (0, 3, 6, 10): {'m7(-5)': ['R, min-3', 'R_, min+1'], 'm7(-5)/R+3': ['R+3, min, dim'],
+                                   'm7(-5)/R+6': ['R_+6, min-5, dim-5'],
+                                   'm7(-5)/R+10': ['R+10, dim-1, (min-1)']},
+                   (0, 3, 6, 8, 10): {'m7(-5, m6)': ['R_, maj, min+1']},
+                   (0, 2, 3, 7, 10): {'m9': ['R, min, min+1', 'R, maj-3, min+1'],
+                                      'm9/R+2': ['R+2, min-2, min-1', 'R+2, maj-5, min-2']},
+                   (0, 2, 3, 5, 7, 10): {'m9/R+5': ['R+5, min+1, min+2'],
+                                         'm11': ['R, maj-2, min', 'R, maj-3, maj-2']},
+                   (0, 2, 3, 6, 10): {'m9(-5)': ['R, min-3, sev+2']},
+                   (0, 2, 3, 7, 9, 10): {'m13': ['R, min+1, dim']},
+                   (0, 3, 7, 9, 10): {'m13': ['R, maj-3, dim', 'R_, maj+1, dim+4']},
+                   (0, 2, 3, 6, 9, 10): {'m13(+11)': ['R, min-3, maj+2']},
+                   (0, 3, 6, 9, 10): {'m13(+11)': ['R_, min+1, dim-2']},
+                   (0, 2, 3, 5, 8, 10): {'m13(m13)': ['R, maj-4, maj-2']},
+                   (0, 3, 6, 11): {'mMaj7(-5)': ['R_, maj-3, (dim+1)']},
+                   (0, 3, 8, 11): {'mMaj7(+5)': ['R_, min, (maj)']},
+                   (0, 2, 3, 7, 11): {'mMaj9': ['R, min, maj+1']},
+                   (0, 2, 3, 8, 11): {'mMaj9(+5)': ['R_, dim-3, min']},
+                   (0, 3, 5, 7, 11): {'mMaj11': ['R, min, sev+1']},
+                   (0, 2, 3, 5, 7, 11): {'mMaj11': ['R, min, dim+2']},
+                   (0, 2, 3, 6, 11): {'mMaj11(+11)': ['R_, maj-3, min-3', 'R_, maj-3, sev-6']},
+                   (0, 3, 5, 7, 9, 11): {'mMaj13': ['R, dim, sev+1']},
+                   (0, 2, 3, 7, 9, 11): {'mMaj13': ['R, maj+1, dim']},
+                   (0, 2, 3, 5, 9, 11): {'mMaj13': ['R, dim, dim+2']},
+                   (0, 3, 6, 9, 11): {'mMaj13(+11)': ['R_, maj-3, sev-3', 'R_, maj-3, dim-5', 'R_, dim-5, sev-3']},
+                   (0, 3, 5, 8, 11): {'mMaj13(m13)': ['R_, maj, dim', 'R_, min, dim', 'R, min-4, min-1']}}
+
+
+def tonePositionsMask(positions):
+    '''Returns the 12 bit mask of the semitone positions that are within the octave (0 to 11)'''
+    mask = 0
+    for apos in positions:
+        if 0 <= apos < 12:
+            mask |= 1 << apos
+    return mask
+
+
+def chordMaskTable(chordTypes):
+    '''
+    Converts a chord table into a list of (chord tones mask, [(chord name, hover text), ...])
+    in the table order
+    '''
+    return [(tonePositionsMask(chdTones), [(chdName, '\n'.join(htxt)) for chdName, htxt in chordTypes[chdTones].items()])
+            for chdTones in chordTypes]
+
+
+chordMaskTables = {ChordLevel.BASIC_ACCORD: chordMaskTable(basicChordTypes),
+                   ChordLevel.ADV_ACCORD: chordMaskTable({**basicChordTypes, **advChordTypes}),
+                   ChordLevel.ALL: chordMaskTable(nydanaIntervals)}
+
+# level -> [(chord tones mask, chord tones from the root), ...] in the table order, for playing chords
+chordToneTables = {level: [(tonePositionsMask(chdTones), tuple(sorted({0, *chdTones}))) for chdTones in chordTypes]
+                   for level, chordTypes in ((ChordLevel.BASIC_ACCORD, basicChordTypes),
+                                             (ChordLevel.ADV_ACCORD, {**basicChordTypes, **advChordTypes}),
+                                             (ChordLevel.ALL, nydanaIntervals))}
+
+# every (level, scale degree mask) fits, so the matches are never computed twice
+@lru_cache(maxsize=len(chordMaskTables) * 4096)
+def matchChords(level, degreeMask):
+    '''
+    Returns the [(raw chord name, hover text), ...] of every chord of the level whose tones are all
+    in degreeMask, the scale tones relative to a scale degree.  There are at most 4096 degree masks per
+    level so the results are kept and later calls are a single lookup.  The list is shared, do not change it.
+    '''
+    matches = []
+    for chdMask, chords in chordMaskTables[level]:
+        if chdMask & degreeMask == chdMask:
+            matches.extend(chords)
+    return matches
+
+
+class ChordNamer:
+    '''
+    ChordNamer finds the chords that fit at each scale degree and names them in the
+    selected chord symbology.
+    param chordSymbology: ChordSymbol
+    param level: ChordLevel - how many chords to name
+    '''
+    def __init__(self, chordSymbology, level=ChordLevel.OFF):
+        self.symbology = chordSymbology
+        self.chordLevel = level
+
+    @property
+    def chordLevel(self):
+        return self.level
+
+    @chordLevel.setter
+    def chordLevel(self, newLevel):
+        self.level = newLevel
+
+    @property
+    def symbology(self):
+        return self.chordsymbology
+
+    @symbology.setter
+    def symbology(self, newSym):
+        self.chordsymbology = newSym
+
+        if self.chordsymbology == ChordSymbol.RAW:
+            self.rep = {'q': 'q'}
+        elif self.chordsymbology == ChordSymbol.COMMON:
+            self.rep = {'sev': '<sup>7</sup>'}
+        elif self.chordsymbology == ChordSymbol.JAZZ:
+            self.rep = {'dim': '<sup>o</sup>', 'aug': '<sup>+</sup>', 'sev': '<sup>7</sup>',
+                        'maj': '<span class="music-symbol" style="font-family: Arial Unicode MS, Lucida Sans Unicode;">Δ</span>',
+                        'min': '-'}
+        else:
+            Exception("Chorder error due to chordsymbology unknow")
+
+        # the pattern is compiled once per symbology and formatted names are kept until it changes
+        self.repPattern = re.compile("|".join(re.escape(k) for k in self.rep))
+        self._formatted = {}
+
+    def chordformater(self, raw):
+        ''' reformats chord to a specific symbology'''
+        cacheKey = (self.chordsymbology, raw)
+        text = self._formatted.get(cacheKey)
+        if text is None:
+            text = self.repPattern.sub(lambda m: self.rep[m.group(0)], raw)
+            self._formatted[cacheKey] = text
+        return text
+
+    def getChordNames(self, noteName, relchordTonePos):
+        '''
+        This method takes a scale, the scale degree and the note at that scale degree and returns a string
+        of chords at Note that fit in the scale.  This provides an aid in music composition as to what chords
+        can be used within a particular scale.   There are multiple levels:
+        Simple:min, maj, 7th, dim and aug
+        all: min[6 7 M7], maj[6 7], 7th[b5], aug, dim, sus2 ...
+
+        13th chords define the basic chord types.  If the 13th is missing, then the 9th, 7th, and triad are checked.
+        All thes chords are named by the highest note. Ex Cmaj13, Cmaj9, Cmaj7, Cmaj, C13, C9, C7, Cmin13, Cmin9, Cmin
+
+        maj13 =
+        min13
+        dom13 =
+
+
+        '''
+
+        chordNames = [f'<p>{noteName} </p>']
+        hoverText = ['']
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('ChordLevel: %s', self.level)
+
+        if self.level != ChordLevel.OFF:
+            # cName = ''
+            # htxt = ''
+            for chdName, htxt in matchChords(self.level, tonePositionsMask(relchordTonePos)):
+                chordNames.append(self.chordformater(chdName))
+                hoverText.append(htxt)
+                    #
+                    # if len(cName) == 0:
+                    #     chordNames.append(fullChdNam)
+                    # else:
+                    #     chordNames.append(', ' + fullChdNam)
+
+            #
+            # if len(cName) == 0:
+            #     cName = f'<p>{noteName}: {relchordTonePos} </p>'
+            # else:
+            #     cName = f'<p>{noteName}: ' + cName + '</p>'
+
+        return (chordNames, hoverText)
+
+
+# Stradella bass and counter-bass rows as intervals relative to the root
+stradellaIntervals = ['R', 'm2', 'M2', 'm3', 'M3', 'P4', 'T', 'P5', 'm6', 'M6', 'm7', 'M7']
+stradellaRows = [['P4', 'R', 'P5', 'M2', 'M6', 'M3', 'M7', 'T', 'm2', 'm6', 'm3', 'm7', 'P4', 'R'],
+                 ['m2', 'm6', 'm3', 'm7', 'P4', 'R', 'P5', 'M2', 'M6', 'M3', 'M7', 'T', 'm2', 'm6']]
+
+
+def stradellaButtons(notePositions):
+    '''
+    Returns the Stradella bass buttons as a list of (col, row, interval text, inScale) where
+    inScale is True when the button's interval is one of the notePositions (semitones from the root)
+    '''
+    buttons = []
+    for xindx in range(len(stradellaRows[0])):
+        for yindx in range(len(stradellaRows)):
+            text = stradellaRows[yindx][xindx]
+            buttons.append((xindx, yindx, text, stradellaIntervals.index(text) in notePositions))
+    return buttons
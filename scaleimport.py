@@ -0,0 +1,195 @@
+'''
+scaleimport reads a scale collection JSON file, {name: [firstModeIntervals, modeNames], ...} as written by
+MainWindow.save, one entry at a time instead of with one json.load, so a catalog of hundreds of MB is imported
+without holding the whole file and its parsed dict in memory.  ScaleImporter hands out the new families in
+batches, so the window can insert each batch and update its progress between them.
+
+A family is a duplicate when its intervals are a rotation of the intervals of a family already known, they are
+then the same modes named from another first mode.
+'''
+import codecs
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# a single entry larger than this is taken as a damaged file instead of read to the end
+maxEntryChars = 16 * 1024 * 1024
+
+# the whitespace between JSON tokens, as json.decoder skips it
+_whitespace = re.compile(r'[ \t\n\r]*')
+# the characters a JSON number can go on with
+_numberChars = re.compile(r'[0-9.eE+-]*')
+
+
+def canonicalRotation(intervals):
+    '''returns the smallest rotation of intervals as a tuple, the same for every mode of a family'''
+    intervals = tuple(intervals)
+    return min((intervals[indx:] + intervals[:indx] for indx in range(len(intervals))), default=())
+
+
+def iterScaleEntries(fp, chunkSize=1024 * 1024):
+    '''
+    Generator of the (name, value, bytesRead) of every entry of the JSON object in the binary file fp, read
+    chunkSize bytes at a time.  bytesRead is how far the file has been read, for progress.
+    Raises ValueError if the file is not a JSON object.
+    '''
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8-sig')()
+    buf = ''
+    pos = 0
+    bytesRead = 0
+    eof = False
+
+    def readMore():
+        nonlocal buf, pos, bytesRead, eof
+        if eof:
+            return False
+        chunk = fp.read(chunkSize)
+        bytesRead += len(chunk)
+        eof = not chunk
+        buf = buf[pos:] + utf8.decode(chunk, final=eof)
+        pos = 0
+        return not eof or len(buf) > 0
+
+    def nextChar():
+        # the next character that is not whitespace, '' at the end of the file
+        nonlocal pos
+        while True:
+            pos = _whitespace.match(buf, pos).end()
+            if pos < len(buf):
+                return buf[pos]
+            if not readMore():
+                return ''
+
+    def decodeValue():
+        nonlocal pos
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                # a number could go on in the next chunk, EX: 12 of 12.5 cut after '.', so a value is only
+                # complete when a character that can not be part of a number follows it
+                if eof or _numberChars.match(buf, end).end() < len(buf):
+                    pos = end
+                    return value
+            except json.JSONDecodeError as err:
+                if eof or len(buf) - pos > maxEntryChars:
+                    raise ValueError(f"not a scale collection: {err}") from None
+            readMore()
+
+    if nextChar() != '{':
+        raise ValueError("not a scale collection, it is not a JSON object")
+    pos += 1
+    if nextChar() == '}':
+        return
+    while True:
+        if nextChar() != '"':
+            raise ValueError(f"not a scale collection, a name is expected at byte {bytesRead}")
+        name = decodeValue()
+        if nextChar() != ':':
+            raise ValueError(f"not a scale collection, ':' is expected after {name!r}")
+        pos += 1
+        nextChar()
+        value = decodeValue()
+        yield name, value, bytesRead
+        separator = nextChar()
+        pos += 1
+        if separator == '}':
+            return
+        if separator != ',':
+            raise ValueError(f"not a scale collection, ',' or '}}' is expected after {name!r}")
+
+
+def validScaleDef(value):
+    '''returns value as [firstModeIntervals, modeNames] or None if it is not a scale family'''
+    if not (isinstance(value, list) and len(value) == 2 and
+            isinstance(value[0], list) and isinstance(value[1], list)):
+        return None
+    intervals, modes = value
+    # json.loads makes only int, float, bool, str, None, list and dict, and type(True) is bool
+    if not intervals or set(map(type, intervals)) != {int} or min(intervals) < 1 or max(intervals) > 255:
+        return None
+    if not modes or set(map(type, modes)) != {str}:
+        return None
+    return [intervals, modes]
+
+
+class ScaleImporter:
+    '''
+    Imports the scale collection file fileName into scales, MainWindow.scales, batch by batch.  Entries that are
+    not a scale family, duplicate a family of scales or one imported before, or have the name of another family
+    are skipped and counted.
+    param fileName: the JSON file
+    param scales: the current scale families {name: [firstModeIntervals, modes]}
+    param chunkSize: bytes read at a time
+    '''
+    def __init__(self, fileName, scales, chunkSize=1024 * 1024):
+        self.fileName = fileName
+        self.scales = scales
+        self._fp = open(fileName, 'rb')
+        self.fileSize = os.fstat(self._fp.fileno()).st_size
+        self._entries = iterScaleEntries(self._fp, chunkSize)
+        self._known = {canonicalRotation(scaleDef[0]) for scaleDef in scales.values()}
+        self.bytesRead = 0
+        self.done = False
+        self.added = 0
+        self.duplicates = 0
+        self.conflicts = 0
+        self.invalid = 0
+
+    @property
+    def progress(self):
+        '''fraction of the file read, 0.0 to 1.0'''
+        return self.bytesRead / self.fileSize if self.fileSize else 1.0
+
+    def nextBatch(self, size=500):
+        '''
+        Reads the next size entries and returns the new families among them as {name: [firstModeIntervals,
+        modes]}, so a batch takes about the same time however many are duplicates.  The caller adds them to
+        scales before asking for the next batch.  Raises ValueError if the file is not a scale
+        collection and OSError if it can not be read, the batches returned before stay valid.
+        '''
+        batch = {}
+        numOfEntries = 0
+        try:
+            for name, value, self.bytesRead in self._entries:
+                numOfEntries += 1
+                scaleDef = validScaleDef(value)
+                if scaleDef is None:
+                    self.invalid += 1
+                    logger.debug("%s is not a scale family: %.80r", name, value)
+                else:
+                    rotation = canonicalRotation(scaleDef[0])
+                    if rotation in self._known:
+                        self.duplicates += 1
+                    elif name in self.scales or name in batch:
+                        self.conflicts += 1
+                        logger.debug("%s is already the name of another scale family", name)
+                    else:
+                        self._known.add(rotation)
+                        batch[name] = scaleDef
+                if numOfEntries >= size:
+                    break
+            else:
+                self.bytesRead = self.fileSize
+                self.close()
+        except (ValueError, OSError):
+            self.close()
+            raise
+        self.added += len(batch)
+        return batch
+
+    def close(self):
+        self.done = True
+        self._fp.close()
+
+    def summary(self):
+        text = f"{self.added} scale families imported"
+        for count, label in ((self.duplicates, "duplicates of known families"),
+                             (self.conflicts, "with the name of another family"),
+                             (self.invalid, "not scale families")):
+            if count:
+                text += f", {count} {label} skipped"
+        return text
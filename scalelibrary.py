@@ -0,0 +1,246 @@
+'''
+scalelibrary reads and writes the scale families ({name: [firstModeIntervals, modeNames]}, the form of
+MainWindow.scales) as one compact binary file, so a library of tens of thousands of families loads with one read
+instead of three QSettings keys and two json.loads per family.
+
+The file is columnar, all numbers little endian:
+    header      magic b'SSLB', version u16, 0 u16, families u32, modes u32, intervals u32, strings u32,
+                string blob bytes u32
+    familyName  u32 per family, index into the string table
+    intervalEnd u32 per family, end of the family's intervals in the interval blob
+    modeEnd     u32 per family, end of the family's modes in modeName
+    modeName    u32 per mode, index into the string table
+    interval blob  u8 per interval
+    string blob    every family and mode name once, utf-8 and NUL separated, so the whole table is decoded
+                   and split in one go
+The file is memory mapped when it is read and written to a temporary file that replaces it, so a crash while
+saving leaves the last library in place.
+
+Rewriting the library for every edit costs as much as the library is large, so changed families can instead be
+appended to the journal file next to it (fileName.journal).  Each journal record is
+    header      magic b'SSLJ', payload bytes u32, zlib.crc32 of the payload u32
+    payload     utf-8 JSON list of [name, [firstModeIntervals, modeNames]] pairs, null for a deleted family
+loadLibrary applies the records in order after reading the library, and saveLibrary removes the journal once the
+new library is in place.  Applying a record again gives the same families, so a crash between the two is safe.
+A record cut short by a crash while appending is dropped.
+'''
+import gc
+import json
+import logging
+import mmap
+import operator
+import os
+import struct
+import zlib
+
+logger = logging.getLogger(__name__)
+
+magic = b'SSLB'
+version = 1
+_header = struct.Struct('<4sHHIIIII')
+journalMagic = b'SSLJ'
+_journalHeader = struct.Struct('<4sII')
+
+
+def packLibrary(scales):
+    '''
+    returns the library file bytes of scales, raises ValueError if an interval does not fit in a byte or a name
+    has a NUL character
+    '''
+    strings = {}
+
+    def stringIndex(text):
+        if '\0' in text:
+            raise ValueError(f"{text!r} has a NUL character")
+        return strings.setdefault(text, len(strings))
+
+    familyName = []
+    intervalEnd = []
+    modeEnd = []
+    modeName = []
+    intervals = bytearray()
+    for name, (firstModeIntervals, modes) in scales.items():
+        familyName.append(stringIndex(name))
+        try:
+            intervals.extend(firstModeIntervals)
+        except ValueError:
+            raise ValueError(f"{name} has an interval that is not 0 to 255: {firstModeIntervals}")
+        intervalEnd.append(len(intervals))
+        modeName.extend(stringIndex(amode) for amode in modes)
+        modeEnd.append(len(modeName))
+    stringBlob = '\0'.join(strings).encode('utf-8')
+    columns = familyName + intervalEnd + modeEnd + modeName
+    return b''.join([_header.pack(magic, version, 0, len(familyName), len(modeName), len(intervals), len(strings),
+                                  len(stringBlob)),
+                     struct.pack(f'<{len(columns)}I', *columns), intervals, stringBlob])
+
+
+def unpackLibrary(data):
+    '''returns the scales of the library file bytes data (bytes, mmap or memoryview), raises ValueError if it is not one'''
+    if len(data) < _header.size:
+        raise ValueError("not a scale library, too short")
+    fileMagic, fileVersion, reserved, numOfFamilies, numOfModes, numOfIntervals, numOfStrings, stringBytes = \
+        _header.unpack_from(data, 0)
+    if fileMagic != magic:
+        raise ValueError("not a scale library")
+    if fileVersion != version:
+        raise ValueError(f"scale library version {fileVersion} is not supported")
+    numOfColumns = 3 * numOfFamilies + numOfModes
+    intervalsAt = _header.size + 4 * numOfColumns
+    stringsAt = intervalsAt + numOfIntervals
+    if len(data) < stringsAt + stringBytes:
+        raise ValueError("scale library is truncated")
+    if len(data) > stringsAt + stringBytes:
+        raise ValueError("scale library has data after the string table")
+    columns = struct.unpack_from(f'<{numOfColumns}I', data, _header.size)
+    familyName = columns[:numOfFamilies]
+    intervalEnd = columns[numOfFamilies:2 * numOfFamilies]
+    modeEnd = columns[2 * numOfFamilies:3 * numOfFamilies]
+    modeName = columns[3 * numOfFamilies:]
+    # the ends must rise to the column lengths and the names index the string table, else the families
+    # would be read from the wrong places
+    for ends, total in ((intervalEnd, numOfIntervals), (modeEnd, numOfModes)):
+        if (ends[-1] if ends else 0) != total or not all(map(operator.le, (0,) + ends, ends)):
+            raise ValueError("scale library columns are damaged")
+    if max(familyName, default=-1) >= numOfStrings or max(modeName, default=-1) >= numOfStrings:
+        raise ValueError("scale library names are damaged")
+    # a UnicodeDecodeError is a ValueError too
+    strings = data[stringsAt:stringsAt + stringBytes].decode('utf-8').split('\0') if numOfStrings else []
+    if len(strings) != numOfStrings:
+        raise ValueError("scale library string table is damaged")
+    intervalBlob = bytes(data[intervalsAt:stringsAt])
+    scales = {}
+    intervalStart = 0
+    modeStart = 0
+    # the lists made here are no garbage, the collector passes they would trigger took half the time
+    gcEnabled = gc.isenabled()
+    gc.disable()
+    try:
+        for indx in range(numOfFamilies):
+            scales[strings[familyName[indx]]] = [list(intervalBlob[intervalStart:intervalEnd[indx]]),
+                                                 [strings[amode] for amode in modeName[modeStart:modeEnd[indx]]]]
+            intervalStart = intervalEnd[indx]
+            modeStart = modeEnd[indx]
+    finally:
+        if gcEnabled:
+            gc.enable()
+    if len(scales) != numOfFamilies:
+        raise ValueError("scale library has a family name twice")
+    return scales
+
+
+def journalFile(fileName):
+    return f"{fileName}.journal"
+
+
+def packJournalRecord(changes):
+    '''
+    returns the journal record bytes of changes, {name: [firstModeIntervals, modeNames] or None if it was
+    deleted}, raises ValueError for the families packLibrary would not take
+    '''
+    packLibrary({name: scaleDef for name, scaleDef in changes.items() if scaleDef is not None})
+    payload = json.dumps([[name, scaleDef] for name, scaleDef in changes.items()], ensure_ascii=False,
+                         separators=(',', ':')).encode('utf-8')
+    return _journalHeader.pack(journalMagic, len(payload), zlib.crc32(payload)) + payload
+
+
+def _journalChange(change):
+    # a [name, scaleDef or None] pair of a record, ValueError if it is not one
+    name, scaleDef = change
+    if not isinstance(name, str):
+        raise ValueError(f"{name!r} is not a family name")
+    if scaleDef is not None:
+        intervals, modes = scaleDef
+        if not (all(type(anInterval) is int for anInterval in intervals) and
+                all(isinstance(amode, str) for amode in modes)):
+            raise ValueError(f"{name} is not a scale family")
+        scaleDef = [list(intervals), list(modes)]
+    return name, scaleDef
+
+
+def applyJournal(scales, data):
+    '''
+    Applies the records of the journal bytes data to scales in order and returns the bytes of the whole records
+    applied, less than len(data) if the journal ends with a record cut short or damaged.
+    '''
+    pos = 0
+    while pos + _journalHeader.size <= len(data):
+        recordMagic, payloadBytes, crc = _journalHeader.unpack_from(data, pos)
+        payload = bytes(data[pos + _journalHeader.size:pos + _journalHeader.size + payloadBytes])
+        if recordMagic != journalMagic or len(payload) != payloadBytes or zlib.crc32(payload) != crc:
+            break
+        try:
+            changes = [_journalChange(change) for change in json.loads(payload.decode('utf-8'))]
+        except (ValueError, TypeError):
+            break
+        for name, scaleDef in changes:
+            if scaleDef is None:
+                scales.pop(name, None)
+            else:
+                scales[name] = scaleDef
+        pos += _journalHeader.size + payloadBytes
+    return pos
+
+
+def appendJournal(fileName, record):
+    '''
+    appends a packJournalRecord record to the journal of the library file fileName and returns the journal size.
+    If it can not be written the journal is cut back to where it was, the records appended later must not follow
+    a partial one.
+    '''
+    with open(journalFile(fileName), 'ab') as fp:
+        start = fp.tell()
+        try:
+            fp.write(record)
+            fp.flush()
+            os.fsync(fp.fileno())
+        except OSError:
+            fp.truncate(start)
+            raise
+        return fp.tell()
+
+
+def loadLibrary(fileName):
+    '''
+    Returns the scales in the library file fileName, read through a memory map, with the changes in its
+    journal applied.  Raises OSError if it can not be read and ValueError if it is not a scale library.
+    '''
+    with open(fileName, 'rb') as fp:
+        if os.fstat(fp.fileno()).st_size == 0:
+            raise ValueError("scale library is empty")
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            scales = unpackLibrary(data)
+    logger.info(f"{len(scales)} scale families loaded from {fileName}")
+    try:
+        with open(journalFile(fileName), 'rb') as fp:
+            journal = fp.read()
+    except FileNotFoundError:
+        return scales
+    applied = applyJournal(scales, journal)
+    if applied < len(journal):
+        # the end of an append that did not finish, records appended later must not follow it
+        logger.warning(f"Scale library journal {journalFile(fileName)} has {len(journal) - applied} damaged "
+                       f"bytes at its end, they are dropped")
+        os.truncate(journalFile(fileName), applied)
+    logger.info(f"{applied} bytes of changes applied from {journalFile(fileName)}")
+    return scales
+
+
+def saveLibrary(fileName, scales):
+    '''writes scales to the library file fileName, through a temporary file that replaces it'''
+    data = packLibrary(scales)
+    tmpName = f"{fileName}.tmp"
+    dirName = os.path.dirname(fileName)
+    if dirName:
+        os.makedirs(dirName, exist_ok=True)
+    with open(tmpName, 'wb') as fp:
+        fp.write(data)
+        fp.flush()
+        os.fsync(fp.fileno())
+    os.replace(tmpName, fileName)
+    # the changes in the journal are in the new library
+    try:
+        os.remove(journalFile(fileName))
+    except FileNotFoundError:
+        pass
+    logger.info(f"{len(scales)} scale families saved to {fileName}")
@@ -0,0 +1,79 @@
+'''
+scalematrix computes the chord/scale compatibility of a whole scale catalog at once with
+NumPy bit operations on 12 bit pitch class masks.  It is used offline, for example to
+generate reharmonization tables:
+
+    python scalematrix.py SavedScales/myScales.json reharm.npz
+
+NumPy is only needed for this module (pip install scalesmithy[batch]).
+'''
+import argparse
+import json
+
+import numpy as np
+
+from scalecore import allKeys, nydanaIntervals, pitchClassMask, rotateMask, tonePositionsMask
+
+
+def scaleInstances(scales):
+    '''
+    Expands a scale catalog ({name: [firstModeIntervals, modes]}) into every family x mode x key.
+    Only octave scales (intervals sum to 12) are included.
+    Returns (labels, masks) where labels is a list of (family, mode, key) and masks is a uint16 array
+    of the absolute pitch class masks (bit 0 = C) in the same order.
+    '''
+    labels = []
+    masks = []
+    for family in scales:
+        intervals = list(scales[family][0])
+        if sum(intervals) != 12:
+            continue
+        for midx, amode in enumerate(scales[family][1]):
+            modeMask = pitchClassMask(intervals[midx:] + intervals[:midx])
+            for keyIndx in range(12):
+                labels.append((family, amode, allKeys[keyIndx + 1]))
+                # rotating down by 12 - keyIndx moves the root up to keyIndx
+                masks.append(rotateMask(modeMask, 12 - keyIndx))
+    return labels, np.array(masks, dtype=np.uint16)
+
+
+def chordTypes(chordTable=nydanaIntervals):
+    '''
+    Returns (labels, masks) for a chord table like nydanaIntervals.  labels is a list of the chord
+    names of each chord tones entry and masks is a uint16 array of the chord tones relative to the root.
+    '''
+    labels = [tuple(chordTable[chdTones]) for chdTones in chordTable]
+    masks = np.array([tonePositionsMask(chdTones) for chdTones in chordTable], dtype=np.uint16)
+    return labels, masks
+
+
+def compatibilityMatrix(scales, chordTable=nydanaIntervals):
+    '''
+    Computes which chords fit every scale instance of the catalog.
+    Returns (matrix, scaleLabels, chordLabels) where matrix is a bool array of shape
+    (scale instances, 12 chord roots, chord types).  matrix[s, r, c] is True when the root r
+    (semitones above C) is a note of scale s and all the tones of chord type c built on r are in
+    the scale, the same rule Chorder.getChordNames uses at each scale degree.
+    '''
+    scaleLabels, scaleMasks = scaleInstances(scales)
+    chordLabels, chordMasks = chordTypes(chordTable)
+    scaleMasks = scaleMasks.astype(np.uint32)
+    roots = np.arange(12, dtype=np.uint32)
+    # scale tones relative to each possible chord root: shape (scale instances, 12)
+    relMasks = ((scaleMasks[:, None] >> roots) | (scaleMasks[:, None] << (12 - roots))) & 0xFFF
+    chordMasks = chordMasks.astype(np.uint32)
+    fits = (relMasks[:, :, None] & chordMasks[None, None, :]) == chordMasks[None, None, :]
+    rootInScale = (relMasks & 1).astype(bool)
+    return fits & rootInScale[:, :, None], scaleLabels, chordLabels
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Write the chord/scale compatibility matrix of a scale catalog.")
+    parser.add_argument("scalefile", help="JSON scale file as written by File->Save")
+    parser.add_argument("outfile", help="output .npz file with matrix, scales and chords arrays")
+    cmdargs = parser.parse_args()
+    with open(cmdargs.scalefile, "r") as fp:
+        catalog = json.load(fp)
+    matrix, scaleLabels, chordLabels = compatibilityMatrix(catalog)
+    np.savez_compressed(cmdargs.outfile, matrix=matrix, scales=np.array(scaleLabels),
+                        chords=np.array([', '.join(names) for names in chordLabels]))
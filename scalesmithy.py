@@ -3,48 +3,58 @@ Created on Nov 10, 2024
 
 @author: keith
 '''
-import argparse
+import os
+import sys
+
+from startupprofile import profiler
+
+# the import times are recorded from here on, before Qt is imported.  Only when this process is
+# scalesmithy itself, python scalesmithy.py or the console script, not when another program imports it.
+# Both forms argparse takes: --profile-startup FILE and --profile-startup=FILE
+if os.path.basename(sys.argv[0]).startswith('scalesmithy') and \
+        any(arg == '--profile-startup' or arg.startswith('--profile-startup=') for arg in sys.argv[1:]):
+    profiler.enable()
+
 import copy
 import json
 import logging
 import random
+import re
 
 from collections import deque
 from enum import Enum
 from math import sin, cos, pi
 
-from PyQt6.QtCore import QSize, Qt, QPointF, QSettings, QRegularExpression, QUrl, QTimer
+from PyQt6.QtCore import QSize, Qt, QPointF, QSettings, QRegularExpression, QUrl, QTimer, QObject, QEvent, pyqtSignal
 from PyQt6.QtGui import QAction, QIcon, QPainter, QRegularExpressionValidator, QTransform, QPixmap
-from PyQt6.QtPrintSupport import QPrinter, QPrintDialog
 from PyQt6.QtWidgets import QApplication, QMainWindow, QGraphicsScene, QGraphicsView, QMessageBox, \
     QDialog, QDialogButtonBox, QVBoxLayout, QLabel, QRadioButton, \
     QComboBox, QWidgetAction, QCheckBox, QGridLayout, QHBoxLayout, QPushButton, QButtonGroup, \
-    QGroupBox, QLineEdit, QTextBrowser, QFileDialog, QListWidget, QListWidgetItem, QGraphicsPixmapItem
+    QGroupBox, QLineEdit, QTextBrowser, QFileDialog, QListWidget, QListWidgetItem, QGraphicsPixmapItem, \
+    QProgressDialog
 
-import mido
-import argparse
-from logutils import *
+from logutils import parse_args, setup_logger
+from midiplayer import MidiPlayer, MidiPorts
+from musicalclasses import Scale, Chorder, StradellaBass, ChordLevel, ChordSymbol, MidiPattern
+from scalecore import ScaleIndex, ScaleMatch, pitchClassMask, ChordPlay, splitNotes, unknownNotes
+from scaleimport import ScaleImporter
+from scalelibrary import loadLibrary
+from settingsstore import SettingsStore
+from textlayout import layoutCache
+from utils import drawText, drawCircle, Pos, Brushes, Pens, CircleGraphicsItem, SceneItems, itemPool
 
-# Parse arguments
-# --tclass classname
-# --tmethod methodname
-# --tlines 52,54
-args = parse_args()
+logger = logging.getLogger(__name__)
 
-# Process the lines argument
-lines = [int(line.strip()) for line in args.tlines.split(",")] if args.tlines else None
+profiler.mark("imported")
 
-# Setup logger with dynamic filtering
-logger = setup_logger(
-        log_level=args.log_level,  # Always set global level to DEBUG
-        filter_params={
-            "tname": args.tname,
-            "tfunc": args.tfunc,
-            "tlines": lines,  },  )
 
+# the QSettings organization and application
+settingsName = ("santabayanian", "ScaleSmithy")
 
-from musicalclasses import Scale, Chorder, StradellaBass, ChordLevel, ChordSymbol, MidiPattern
-from utils import drawText, drawCircle, Pos, Brushes, Pens, CircleGraphicsItem
+# scale files larger than this are imported whole with a ScaleImporter instead of picked from a ScaleSelectDlg
+selectDlgMaxBytes = 1024 * 1024
+# families inserted between two updates of the window while importing
+importBatchSize = 500
 
 
 class RootPosition(Enum):
@@ -54,6 +64,29 @@ class RootPosition(Enum):
     R6 = 90
 
 
+class FirstPaintProfiler(QObject):
+    '''
+    Writes the startup profile to fileName once widget has been painted the first time and quits the application.
+    '''
+    def __init__(self, widget, fileName):
+        super().__init__(widget)
+        self.fileName = fileName
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            # the timer fires after the paint event has been handled
+            QTimer.singleShot(0, self.firstPaint)
+        return False
+
+    def firstPaint(self):
+        profiler.mark("firstPaint")
+        profiler.stopImports()
+        profiler.write(self.fileName)
+        QApplication.instance().quit()
+
+
 class ScaleSelectDlg(QDialog):
     def __init__(self, parent, prompt, scales, cfScales={}):
         '''
@@ -103,6 +136,14 @@ class ScaleSelectDlg(QDialog):
     def accept(self):
         self.done(1)
 
+class MidiPlayerSignals(QObject):
+    '''
+    Carries the MidiPlayer callbacks from the player thread to the GUI thread
+    '''
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal()
+
+
 class MidiSettingsDlg(QDialog):
     def __init__(self, parent):
         super().__init__(parent)
@@ -120,7 +161,7 @@ class MidiSettingsDlg(QDialog):
         hlayout = QHBoxLayout()
 
         self.outputPortsbox = QComboBox()
-        self.refeshPorts()
+        self.fillPorts()
 
         self.outputPortsbox.currentTextChanged.connect(self.newPort)
         hlayout.addWidget(self.outputPortsbox)
@@ -334,6 +375,24 @@ class MidiSettingsDlg(QDialog):
 
         layout.addWidget(patGrpBox)
 
+        chdGrpBox = QGroupBox("Play the chords of each scale degree")
+        chdlayout = QHBoxLayout()
+        self.chordPlayBtns = {}
+        for chordPlay, label in ((ChordPlay.OFF, "No, play the patterns"), (ChordPlay.BLOCK, "Block chords"),
+                                 (ChordPlay.BROKEN, "Broken chords")):
+            self.chordPlayBtns[chordPlay] = QRadioButton(label)
+            self.chordPlayBtns[chordPlay].setChecked(chordPlay == self.parent().midiChordPlay)
+            self.chordPlayBtns[chordPlay].toggled.connect(self.newChordPlay)
+            chdlayout.addWidget(self.chordPlayBtns[chordPlay])
+        chdlayout.addWidget(QLabel("on channels: "))
+        self.chordChannelsBox = QComboBox()
+        self.chordChannelsBox.addItems(['1', '2', '3', '4'])
+        self.chordChannelsBox.setCurrentText(str(self.parent().midiChordChannels))
+        self.chordChannelsBox.currentTextChanged.connect(self.newChordChannels)
+        chdlayout.addWidget(self.chordChannelsBox)
+        chdGrpBox.setLayout(chdlayout)
+        layout.addWidget(chdGrpBox)
+
         plyBtn = QPushButton('Play Scale')
         plyBtn.clicked.connect(self.parent().playSynth)
 
@@ -345,11 +404,22 @@ class MidiSettingsDlg(QDialog):
     def progChange(self):
         self.parent().midiProgNum = self.programBox.currentIndex()
 
-    def refeshPorts(self):
+    def fillPorts(self):
+        import mido
         self.output_ports = mido.get_output_names()
+        # the port only changes when one is selected, not while the list is refilled
+        self.outputPortsbox.blockSignals(True)
         self.outputPortsbox.clear()
         self.outputPortsbox.addItems(self.output_ports)
         self.outputPortsbox.setCurrentText(self.parent().midiPortName)
+        self.outputPortsbox.blockSignals(False)
+        # if the saved port is gone the first one is shown, it is only used once the dialog is accepted
+
+    def refeshPorts(self):
+        self.fillPorts()
+        if self.parent().midiPortName in self.output_ports:
+            # the device may have been reconnected
+            self.parent().changeMidiPort(self.parent().midiPortName, reopen=True)
 
     def newTempo(self):
         self.parent().midiTempo = int(self.tempoBox.text())
@@ -374,15 +444,25 @@ class MidiSettingsDlg(QDialog):
         logger.debug(pattern)
         self.parentWidget().midiPattern = pattern
 
+    def newChordPlay(self):
+        for chordPlay, btn in self.chordPlayBtns.items():
+            if btn.isChecked():
+                self.parent().midiChordPlay = chordPlay
+
+    def newChordChannels(self):
+        self.parent().midiChordChannels = int(self.chordChannelsBox.currentText())
+
     def newNumOct(self):
         self.parent().midiNumOctaves = int(self.numOctavesBox.currentText())
 
 
 
     def newPort(self):
-        self.parent().midiPortName = self.outputPortsbox.currentText()
+        self.parent().changeMidiPort(self.outputPortsbox.currentText())
 
     def accept(self):
+        if self.outputPortsbox.currentText() != self.parent().midiPortName:
+            self.parent().changeMidiPort(self.outputPortsbox.currentText())
         self.done(1)
 
 
@@ -536,9 +616,14 @@ class FindScaleDlg(QDialog):
 
     '''
 
-    def __init__(self, knownScales, parent=None):
+    def __init__(self, scaleIndex, preferredFamilies=(), parent=None):
+        '''
+        :param scaleIndex: ScaleIndex of the scale families
+        :param preferredFamilies: family names listed first, in this order, when several families have the notes
+        '''
         super().__init__(parent)
-        self.knownScales = knownScales
+        self.scaleIndex = scaleIndex
+        self.familyRank = {name: rank for rank, name in enumerate(preferredFamilies)}
         self.ukintervals = None
         self.found = False
         self.key = ""
@@ -554,6 +639,13 @@ class FindScaleDlg(QDialog):
         self.noteEditBox = QLineEdit()
         hlayout1.addWidget(self.noteEditBox)
         layout.addLayout(hlayout1)
+        self.anyRootChkbox = QCheckBox('Unknown root: list every matching family, mode and key.\n'
+                                       'Notes may be a fragment, separate several fragments with ";"')
+        layout.addWidget(self.anyRootChkbox)
+        self.matchList = QListWidget()
+        self.matchList.currentRowChanged.connect(self.selectMatch)
+        layout.addWidget(self.matchList)
+        self.matches = []
         hlayout2 = QHBoxLayout()
         hlayout2.addWidget(QLabel("Key:"))
         self.keylabel = QLabel("")
@@ -580,10 +672,19 @@ class FindScaleDlg(QDialog):
         self.setLayout(layout)
 
     def find(self):
+        if self.anyRootChkbox.isChecked():
+            self.findAll()
+            return
         # First note is assumed key
-        chromScale = {'A':0, 'A#':1, 'Bb':1, 'B':2, 'C':3, 'C#':4, 'Db:4':4, 'D':5, 'D#':6, 'Eb':6, 'E':7, 'F':8,
+        chromScale = {'A':0, 'A#':1, 'Bb':1, 'B':2, 'C':3, 'C#':4, 'Db':4, 'D':5, 'D#':6, 'Eb':6, 'E':7, 'F':8,
                         'F#':9, 'Gb':9, 'G':10, 'G#':11, 'Ab':11}
-        notes = self.noteEditBox.text().split()
+        self.clearResult()
+        notes = splitNotes(self.noteEditBox.text())
+        unknown = unknownNotes(notes)
+        if not notes or unknown:
+            self.scaleFamlabel.setText(f"Unknown notes: {' '.join(unknown)}" if unknown else "Not Found")
+            self.modelabel.setText("Not Found")
+            return
         self.key = notes[0]
         self.keylabel.setText(self.key)
         noteNumbers = [(chromScale[akey] - chromScale[notes[0]]) for akey in notes]
@@ -598,28 +699,81 @@ class FindScaleDlg(QDialog):
         keycpos = chromScale[notes[0]]
         self.ukintervals = deque([h-l for h,l in zip(noteNumbers[1:], noteNumbers[:-1])])
         logger.debug(self.ukintervals)
-        self.found = False
-        for self.scalefamily in self.knownScales:
-            intervals = deque(self.knownScales[self.scalefamily][0])
-            if len(intervals) != len(self.ukintervals):
-                continue
-
-            modes = self.knownScales[self.scalefamily][1]
-            for midx, self.mode in enumerate(modes):
-                rotIntvls = intervals.copy()
-                rotIntvls.rotate(-midx)
-                #rotIntvls.appendleft(0)
-                logger.debug(f"{self.ukintervals} == {rotIntvls} ?")
-                if self.ukintervals == rotIntvls:
-                    logger.info(self.scalefamily)
-                    logger.info(self.mode)
-                    self.found = True
-                    break;
-            if self.found:
-                break
+        # a single lookup of the notes pitch class mask in the scale index, every match is listed and the
+        # first one, a preferred family or else by family name, is selected
+        matches = sorted(self.scaleIndex.find(pitchClassMask(self.ukintervals)), key=self.matchOrder)
+        self.matchList.clear()
+        self.matches = [ScaleMatch(family, mode, self.key, 0) for family, mode in matches]
+        for amatch in self.matches:
+            self.matchList.addItem(f"{amatch.key} {amatch.family}: {amatch.mode}")
+        self.found = len(matches) > 0
         if self.found:
+            self.matchList.setCurrentRow(0)
+            logger.info(self.scalefamily)
+            logger.info(self.mode)
+        else:
+            self.scaleFamlabel.setText("Not Found")
+            self.modelabel.setText("Not Found")
+
+    def clearResult(self):
+        # nothing of an earlier search is kept, so it can not be set by accident
+        self.found = False
+        self.ukintervals = None
+        self.matchList.clear()
+        self.matches = []
+        self.keylabel.setText("")
+        self.scaleFamlabel.setText("")
+        self.modelabel.setText("")
+
+    def matchOrder(self, match):
+        # the modes of a family keep their order, sorted() is stable
+        family = match[0]
+        return (family not in self.familyRank, self.familyRank.get(family, 0), family)
+
+    def findAll(self):
+        '''Lists every (family, mode, key) that contains each fragment of notes, best match first'''
+        fragments = [afrag.strip() for afrag in self.noteEditBox.text().split(';') if splitNotes(afrag)]
+        # fragments with a note name that is not known get an error row instead of being searched
+        validFragments = [afrag for afrag in fragments if not unknownNotes(afrag)]
+        allMatches = dict(zip(validFragments, self.scaleIndex.findAllMany(validFragments)))
+        self.clearResult()
+        for afrag in fragments:
+            fragMatches = allMatches.get(afrag, [])
+            if afrag in allMatches:
+                header = QListWidgetItem(f"{afrag}:  {len(fragMatches)} matches")
+            else:
+                header = QListWidgetItem(f"{afrag}:  unknown notes {' '.join(unknownNotes(afrag))}")
+                header.setForeground(Brushes().red)
+            header.setFlags(Qt.ItemFlag.NoItemFlags)
+            self.matchList.addItem(header)
+            self.matches.append(None)
+            for amatch in fragMatches:
+                extra = f"  (+{amatch.extraNotes} notes)" if amatch.extraNotes else ""
+                self.matchList.addItem(f"    {re.sub('<[^>]+>', '', amatch.key)} {amatch.family}: {amatch.mode}{extra}")
+                self.matches.append(amatch)
+        # the first match, the header rows of the fragments can not be selected
+        firstRow = next((row for row, amatch in enumerate(self.matches) if amatch), None)
+        if firstRow is None:
+            self.scaleFamlabel.setText("Not Found")
+            self.modelabel.setText("Not Found")
+        else:
+            self.matchList.setCurrentRow(firstRow)
+
+    def selectMatch(self, row):
+        if 0 <= row < len(self.matches) and self.matches[row]:
+            amatch = self.matches[row]
+            self.found = True
+            self.scalefamily = amatch.family
+            self.mode = amatch.mode
+            self.key = amatch.key
+            self.keylabel.setText(self.key)
             self.scaleFamlabel.setText(self.scalefamily)
             self.modelabel.setText(self.mode)
+
+    def accept(self):
+        # without a match or the intervals of the entered notes there is no scale to set
+        if self.found or self.ukintervals:
+            super().accept()
         else:
             self.scaleFamlabel.setText("Not Found")
             self.modelabel.setText("Not Found")
@@ -769,14 +923,19 @@ class ContactDlg(QDialog):
 
 class MainWindow(QMainWindow):
     def __init__(self, args):
+        profiler.begin("MainWindow.__init__")
         super().__init__()
 
         #logging.basicConfig(level=args.loglevel[0])
 
         logger.info('Scale Smithy Started.  The configuration file being used is:')
-        self.settings = QSettings("santabayanian", "ScaleSmithy")
+        self.settings = QSettings(*settingsName)
         logger.info(self.settings.fileName())
-        priScaleName, priScaleMode, priScaleKey, refScaleName, refScaleMode, refScaleKey = self.readSettings()
+        self.layoutCacheFile = args.layout_cache
+        if self.layoutCacheFile:
+            layoutCache.load(self.layoutCacheFile)
+        with profiler.phase("readSettings"):
+            priScaleName, priScaleMode, priScaleKey, refScaleName, refScaleMode, refScaleKey = self.readSettings()
         self.resize(QSize(850, 1100))
         self.setStyleSheet("QMainWindow { border: 1px solid black; }")
         self.angOffset = float(self.rootPos.value)
@@ -794,6 +953,7 @@ class MainWindow(QMainWindow):
         # scale and mode titles
         self.scaleFamilyGI = None
         self.modeGI = None
+        self.titleItems = None
 
         # set the graphics scene size and the app window size
         self.scene = QGraphicsScene(-420, -490, 840, 980)
@@ -804,11 +964,24 @@ class MainWindow(QMainWindow):
         self.view.setTransform(self.fixyxfm)
 
         self.drawCorners()
+        self.titleItems = SceneItems(self.scene)
 
         self.chorder = Chorder(self.scene, self.chordSymbology, self.chordNameLevel)
 
+        # scales are played on the MidiPlayer thread, its progress is shown in the status bar
+        self.midiPlayerSignals = MidiPlayerSignals()
+        self.midiPlayerSignals.progress.connect(self.playProgress)
+        self.midiPlayerSignals.finished.connect(self.playFinished)
+        self.midiPlayer = MidiPlayer(progress=self.midiPlayerSignals.progress.emit,
+                                     finished=self.midiPlayerSignals.finished.emit)
+        # MIDI output ports stay open until the port is changed or the window closes
+        self.midiPorts = MidiPorts()
+
         if len(self.scales) == 0:
             self.scales = self.defaultScales()
+            self.settingsStore.replaceFamilies(self.scales)
+        self.scaleIndex = ScaleIndex(self.scales)
+        self.scaleImporter = None
 
         self.scaleCenterPt = QPointF(0, 20)
 
@@ -826,6 +999,7 @@ class MainWindow(QMainWindow):
 
 
         # setup menu
+        profiler.begin("menus")
         menu = self.menuBar()
         #File Menu
         file_menu = menu.addMenu("&File")
@@ -895,6 +1069,15 @@ class MainWindow(QMainWindow):
         play_action = QAction("Play To Port", self)
         play_action.triggered.connect(self.playSynth)
         midiMenu.addAction(play_action)
+        self.pause_action = QAction("Pause", self)
+        self.pause_action.triggered.connect(self.pausePlaying)
+        midiMenu.addAction(self.pause_action)
+        stop_action = QAction("Stop Playing", self)
+        stop_action.triggered.connect(self.stopPlaying)
+        midiMenu.addAction(stop_action)
+        export_action = QAction("Export MIDI File", self)
+        export_action.triggered.connect(self.exportMidi)
+        midiMenu.addAction(export_action)
         midiSettings_action = QAction('MIDI Settings', self)
         midiSettings_action.triggered.connect(self.midiSettings)
         midiMenu.addAction(midiSettings_action)
@@ -914,6 +1097,7 @@ class MainWindow(QMainWindow):
         contactmenu = QAction("Contact", self)
         contactmenu.triggered.connect(self.contact)
         helpmenu.addAction((contactmenu))
+        profiler.end("menus")
 
 
 
@@ -934,12 +1118,16 @@ class MainWindow(QMainWindow):
         self.stradella =  StradellaBass(self.scene, 10, -410, self.pen)
 
         # draw chromatic circle and stradella layout 
-        self.drawChromCircle(centerPt=self.scaleCenterPt)
-        self.stradella.draw_Stradella(self.primaryScale.noteSemitonePositions,
-                                      self.showStradella)
+        with profiler.phase("drawChromCircle"):
+            self.drawChromCircle(centerPt=self.scaleCenterPt)
+        with profiler.phase("draw_Stradella"):
+            self.stradella.draw_Stradella(self.primaryScale.noteSemitonePositions,
+                                          self.showStradella)
 
         # draw the scale.  Also draw reference scale if it exists
-        self.drawScale()
+        with profiler.phase("drawScale"):
+            self.drawScale()
+        profiler.end("MainWindow.__init__")
 
     def defaultScales(self):
         '''
@@ -968,18 +1156,13 @@ class MainWindow(QMainWindow):
         return scales
 
     def writeSettings(self):
-        "writes settings to config file ($HOME/.config/santabayanian/scaleTool.conf"
+        '''
+        writes the window and the current scales to the config file ($HOME/.config/santabayanian/scaleTool.conf).
+        The preferences and scale families are saved by self.settingsStore when they are changed.
+        '''
         self.settings.beginGroup("MainWindow")
         self.settings.setValue("size", self.size())
         self.settings.setValue("pos", self.pos())
-        self.settings.setValue("showStradella", self.showStradella)
-        self.settings.endGroup()
-        self.settings.beginGroup("chromCir")
-        self.settings.setValue("rootpos", self.rootPos)
-        self.settings.endGroup()
-        self.settings.beginGroup("chords")
-        self.settings.setValue("chordNameLevel", self.chorder.level)
-        self.settings.setValue("chordsymbology", self.chorder.symbology)
         self.settings.endGroup()
         self.settings.beginGroup("scale")
         self.settings.setValue("CurrentScale", self.primaryScale.name)
@@ -993,23 +1176,30 @@ class MainWindow(QMainWindow):
             self.settings.setValue("RefScale", self.refScale.name)
             self.settings.setValue("RefMode", self.refScale.mode)
             self.settings.setValue("RefKey", self.refScale.key)
-        self.settings.beginWriteArray("scales")
-        for i, akey in enumerate(self.scales):
-            self.settings.setArrayIndex(i)
-            self.settings.setValue("scaleName", akey)
-            self.settings.setValue("intervals", json.dumps(self.scales[akey][0]))
-            self.settings.setValue("modes", json.dumps(self.scales[akey][1]))
-
-        self.settings.endArray()
+        self.settings.setValue("scaleLibrary", self.scaleLibraryFile)
         self.settings.endGroup()
 
-        self.settings.beginGroup('midi')
-        self.settings.setValue("midiPortName", self.midiPortName )
-        self.settings.setValue("midiNumOctaves", self.midiNumOctaves)
-        self.settings.setValue("midiProgNum", self.midiProgNum)
-        self.settings.setValue("midiTempo", self.midiTempo)
-        self.settings.setValue("midiPattern", self.midiPattern)
-        self.settings.endGroup()
+    def preferences(self):
+        '''the preferences edited in the Preferences and MIDI Settings dialogs as {QSettings key: value}'''
+        # rootpos is saved as its value, a pickled RootPosition would be __main__.RootPosition or
+        # scalesmithy.RootPosition depending on how scalesmithy was started
+        return {"MainWindow/showStradella": self.showStradella,
+                "chromCir/rootpos": self.rootPos.value,
+                "chords/chordNameLevel": self.chorder.level,
+                "chords/chordsymbology": self.chorder.symbology,
+                "midi/midiPortName": self.midiPortName,
+                "midi/midiNumOctaves": self.midiNumOctaves,
+                "midi/midiProgNum": self.midiProgNum,
+                "midi/midiTempo": self.midiTempo,
+                "midi/midiPattern": self.midiPattern,
+                "midi/midiChordPlay": self.midiChordPlay,
+                "midi/midiChordChannels": self.midiChordChannels}
+
+    def storeChangedPreferences(self, before):
+        '''hands the preferences that differ from before, a preferences() dict, to self.settingsStore'''
+        for key, value in self.preferences().items():
+            if value != before.get(key):
+                self.settingsStore.setValue(key, value)
 
     def readSettings(self):
         "read settings from config file ($HOME/.config/santabayanian/scaleTool.conf"
@@ -1040,16 +1230,7 @@ class MainWindow(QMainWindow):
         refScaleName = self.settings.value("RefScale", None)
         refScaleMode = self.settings.value("RefMode", None)
         refScaleKey = self.settings.value("RefKey", None)
-        numScales = self.settings.beginReadArray("scales")
-        self.scales = {}
-        for i in range(numScales):
-            self.settings.setArrayIndex(i)
-            name = self.settings.value("scaleName")
-            modes = json.loads(self.settings.value("modes"))
-            intervals = json.loads(self.settings.value("intervals"))
-            self.scales[name] = [intervals, modes]
-
-        self.settings.endArray()
+        self.scales = self.readScales()
         self.settings.endGroup()
 
         self.settings.beginGroup('midi')
@@ -1058,12 +1239,61 @@ class MainWindow(QMainWindow):
         self.midiProgNum = int(self.settings.value("midiProgNum", 0))
         self.midiTempo = int(self.settings.value("midiTempo", 120))
         self.midiPattern = self.settings.value("midiPattern", MidiPattern.NONE)
+        self.midiChordPlay = self.settings.value("midiChordPlay", ChordPlay.OFF)
+        self.midiChordChannels = int(self.settings.value("midiChordChannels", 1))
         self.settings.endGroup()
         return [primaryScaleName, primaryScaleMode, primaryScaleKey, refScaleName, refScaleMode, refScaleKey]
 
+    def readScales(self):
+        '''
+        Returns the scale families from the scale library file and sets up self.settingsStore, which saves the
+        changes to them.  Settings of earlier versions have no library file, their families are read from the
+        scales array and moved to the library file.  Called in the settings group "scale".
+        '''
+        self.scaleLibraryFile = (self.settings.value("scaleLibrary", "") or
+                                 os.path.join(os.path.dirname(self.settings.fileName()), "ScaleSmithy.scales"))
+        if os.path.exists(self.scaleLibraryFile):
+            try:
+                scales = loadLibrary(self.scaleLibraryFile)
+            except (OSError, ValueError) as err:
+                # kept for recovery, the default families are used and saved in its place
+                badFile = self.scaleLibraryFile + ".bad"
+                logger.error(f"Scale library {self.scaleLibraryFile} not loaded, moved to {badFile}: {err}")
+                try:
+                    os.replace(self.scaleLibraryFile, badFile)
+                except OSError:
+                    pass
+                scales = {}
+            self.settingsStore = SettingsStore(settingsName, self.scaleLibraryFile, scales)
+            return scales
+        numScales = self.settings.beginReadArray("scales")
+        scales = {}
+        for i in range(numScales):
+            self.settings.setArrayIndex(i)
+            name = self.settings.value("scaleName")
+            modes = json.loads(self.settings.value("modes"))
+            intervals = json.loads(self.settings.value("intervals"))
+            scales[name] = [intervals, modes]
+        self.settings.endArray()
+        self.settingsStore = SettingsStore(settingsName, self.scaleLibraryFile, {})
+        if scales:
+            self.settingsStore.replaceFamilies(scales)
+            # removed once the library file is written
+            self.settingsStore.remove("scale/scales")
+        return scales
+
     def closeEvent(self, event):
         "When main window closes write current setting to conf file"
+        self.midiPlayer.stop()
+        self.midiPorts.closeAll()
+        if self.scaleImporter is not None:
+            # the families imported so far are saved with the other changes
+            self.importTimer.stop()
+            self.scaleImporter.close()
+        self.settingsStore.close()
         self.writeSettings()
+        if self.layoutCacheFile:
+            layoutCache.save(self.layoutCacheFile)
         event.accept()
 
     def save(self):
@@ -1079,8 +1309,13 @@ class MainWindow(QMainWindow):
                 json.dump(dlg.getSelectedScales(), fp)
 
     def load(self):
+        if self.scaleImporter is not None:
+            return
         fileNameInfo = QFileDialog.getOpenFileName(self, "Load Scales", "", "JSON Files (*.json)")
         if len(fileNameInfo[0]) > 0:
+            if os.path.getsize(fileNameInfo[0]) > selectDlgMaxBytes:
+                self.importScales(fileNameInfo[0])
+                return
             with open(fileNameInfo[0], "r") as fp:
                 ldscales = json.load(fp)
             dlg = ScaleSelectDlg(self, ("Select which scales to load from file.\n" +
@@ -1091,23 +1326,82 @@ class MainWindow(QMainWindow):
                 logger.debug(chosenscales )
                 for akey in chosenscales:
                     self.scales[akey] = chosenscales[akey]
+                    self.scaleIndex.add(akey, chosenscales[akey])
+                    self.settingsStore.setFamily(akey, chosenscales[akey])
                 self.scale_Menu.clear()
                 self.buildScaleMenu()
             else:
                 logger.debug("Canceled")
 
+    def importScales(self, fileName):
+        '''
+        imports every new scale family of the scale file fileName, a batch per pass of the event loop so the
+        window keeps drawing, with a progress dialog that can cancel it.  The families imported before a cancel
+        or an error are kept.
+        '''
+        try:
+            self.scaleImporter = ScaleImporter(fileName, self.scales)
+        except OSError as err:
+            QMessageBox.warning(self, "Load Scales", f"{fileName} could not be read: {err}")
+            return
+        self.importProgress = QProgressDialog(f"Importing {os.path.basename(fileName)}", "Cancel", 0, 1000, self)
+        self.importProgress.setWindowTitle("Load Scales")
+        self.importProgress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.importProgress.setMinimumDuration(500)
+        self.importTimer = QTimer(self, timeout=self.importBatch)
+        self.importTimer.start(0)
+
+    def importBatch(self):
+        importer = self.scaleImporter
+        error = None
+        if self.importProgress.wasCanceled():
+            importer.close()
+        else:
+            try:
+                batch = importer.nextBatch(importBatchSize)
+            except (ValueError, OSError) as err:
+                error = err
+                batch = {}
+            for akey in batch:
+                self.scales[akey] = batch[akey]
+                self.scaleIndex.add(akey, batch[akey])
+            if batch:
+                self.settingsStore.setFamilies(batch)
+            self.importProgress.setValue(int(1000 * importer.progress))
+            if not importer.done:
+                return
+        self.importTimer.stop()
+        self.importProgress.close()
+        self.importTimer.deleteLater()
+        self.importProgress.deleteLater()
+        self.scaleImporter = None
+        logger.info(f"{importer.fileName}: {importer.summary()}")
+        if importer.added:
+            self.scale_Menu.clear()
+            self.buildScaleMenu()
+        if error is not None:
+            QMessageBox.warning(self, "Load Scales", f"{importer.fileName} stopped at byte {importer.bytesRead}: "
+                                                     f"{error}\n{importer.summary()}")
+        else:
+            QMessageBox.information(self, "Load Scales", importer.summary() + ".")
+
     def findScale(self):
-        dlg = FindScaleDlg(self.scales)
+        dlg = FindScaleDlg(self.scaleIndex, list(self.defaultScales()))
         if dlg.exec():
             logger.debug("set to this scale")
-            self.primaryScale.deleteGraphicItems()
+            oldScale = self.primaryScale
+            if not dlg.found and not dlg.ukintervals:
+                logger.info("No scale found to set")
+                return
             if dlg.found:
                 scaleName = dlg.scalefamily
                 self.primaryScale = Scale(dlg.scalefamily, self.scales[ dlg.scalefamily], self.scene)
+                self.primaryScale.mode = dlg.mode
                 self.buildModeMenu()
             else:
                 logger.debug(dlg.ukintervals)
                 self.primaryScale = Scale("Unknown", [dlg.ukintervals, ["unkn", "unkn"]], self.scene)
+            self.primaryScale.takeGraphicItems(oldScale)
 
             self.primaryScale.key = dlg.key
             self.drawScale()
@@ -1155,6 +1449,8 @@ class MainWindow(QMainWindow):
                     newIntvls = [(dlg.selNotes[i + 1] - dlg.selNotes[i]) for i in range(len(dlg.selNotes) - 1)]
 
                     self.scales[scaleName] = [newIntvls, modeNames]
+                    self.scaleIndex.add(scaleName, self.scales[scaleName])
+                    self.settingsStore.setFamily(scaleName, self.scales[scaleName])
                     self.scale_Menu.clear()
                     self.buildScaleMenu()
 
@@ -1183,6 +1479,8 @@ class MainWindow(QMainWindow):
         if result == QMessageBox.StandardButton.Ok:
             self.primaryScale.deleteGraphicItems()
             del self.scales[self.primaryScale.name]
+            self.scaleIndex.remove(self.primaryScale.name)
+            self.settingsStore.deleteFamily(self.primaryScale.name)
             self.scale_Menu.clear()
             self.buildScaleMenu()
 
@@ -1203,12 +1501,16 @@ class MainWindow(QMainWindow):
         result = msgBox.exec()
         if result == 0:
             self.scales = self.defaultScales()
+            self.scaleIndex.rebuild(self.scales)
+            self.settingsStore.replaceFamilies(self.scales)
             self.scale_Menu.clear()
             self.buildScaleMenu()
         elif result == 1:
             defScale = self.defaultScales()
             for ascale in defScale:
                 self.scales[ascale] = defScale[ascale]
+                self.scaleIndex.add(ascale, defScale[ascale])
+                self.settingsStore.setFamily(ascale, defScale[ascale])
             self.scale_Menu.clear()
             self.buildScaleMenu()
         elif result == 2:
@@ -1217,9 +1519,10 @@ class MainWindow(QMainWindow):
             logger.warning(f"Scale Restore Error: {result}")
 
     def prefEdit(self):
+        before = self.preferences()
         dlg = PrefEditorDlg(self, self.chorder.level, self.chorder.symbology, self.rootPos)
         if dlg.exec():
-            self.chorder.level = dlg.chordLevel
+            self.chordNameLevel = self.chorder.level = dlg.chordLevel
             self.chordSymbology = dlg.chordSymbol
             self.chorder.symbology = self.chordSymbology
             self.rootPos = dlg.rootPos
@@ -1229,14 +1532,18 @@ class MainWindow(QMainWindow):
             self.drawTitle()
             self.drawChromCircle(centerPt=self.scaleCenterPt)
             self.drawScale()
+            self.storeChangedPreferences(before)
 
 
 
 
     def midiSettings(self):
+        before = self.preferences()
         dlg = MidiSettingsDlg(self)
-        if dlg.exec():
-            pass
+        dlg.exec()
+        # the settings are applied as they are changed in the dialog, also when it is cancelled, except the port
+        # shown in place of a missing one, which is applied when it is accepted
+        self.storeChangedPreferences(before)
 
 
     def clearRef(self):
@@ -1245,13 +1552,15 @@ class MainWindow(QMainWindow):
             self.refScale = None
 
     def setRef(self):
-        self.clearRef()
+        oldRef = self.refScale
         refScaleName = copy.deepcopy(self.primaryScale.name)
         refScaleMode = copy.deepcopy(self.primaryScale.mode)
         refScaleKey = copy.deepcopy(self.primaryScale.key)
         self.refScale = Scale(refScaleName, self.scales[refScaleName], self.scene)
         self.refScale.mode = refScaleMode
         self.refScale.key = refScaleKey
+        if oldRef:
+            self.refScale.takeGraphicItems(oldRef)
         self.drawRefScale()
 
     def swapRef(self):
@@ -1308,12 +1617,13 @@ class MainWindow(QMainWindow):
             anAction.triggered.connect(self.setKey)
 
     def setScale(self):
-        self.primaryScale.deleteGraphicItems()
+        oldScale = self.primaryScale
         key = self.primaryScale.key
         # .replace('&', '') is Fix for KDE  that adds '&' to text
         self.primaryScale = Scale(self.sender().text().replace('&', ''),
                                   self.scales[self.sender().text().replace('&', '')], self.scene)
         self.primaryScale.key = key
+        self.primaryScale.takeGraphicItems(oldScale)
         self.buildModeMenu()
         self.drawScale()
 
@@ -1356,7 +1666,7 @@ class MainWindow(QMainWindow):
         # 0.25 * is w=93.75 h=91.75
         w = 0.25*cornerGPM.boundingRect().width()
         h = 0.25*cornerGPM.boundingRect().height()
-        print(f"w={w} h={h}")
+        logger.debug(f"w={w} h={h}")
         position = [self.scene.sceneRect().bottomLeft()  + QPointF(w , 0), #Top left
                     self.scene.sceneRect().bottomRight()    + QPointF(-w  , 0),  #Top right
                     self.scene.sceneRect().topLeft()     + QPointF(w , 0),  #Bottom left
@@ -1373,20 +1683,13 @@ class MainWindow(QMainWindow):
 
 
     def drawTitle(self):
-        if  self.scaleFamilyGI:
-            self.scene.removeItem(self.scaleFamilyGI)
-            del self.scaleFamilyGI
-
-        self.scaleFamilyGI = drawText(self.scene, QPointF(-380, 440), f"Family: {self.primaryScale.name}", size=20,
-                                          position=Pos.LEFT_CENTER)
-
-        if  self.modeGI:
-            self.scene.removeItem(self.modeGI)
-            del self.modeGI
+        self.titleItems.begin()
+        self.scaleFamilyGI = self.titleItems.text('family', QPointF(-380, 440), f"Family: {self.primaryScale.name}",
+                                                  size=20, position=Pos.LEFT_CENTER)
+        self.modeGI = self.titleItems.text('mode', QPointF(-380, 410), f"Mode: {self.primaryScale.mode}", size=20,
+                                           position=Pos.LEFT_CENTER)
+        self.titleItems.end()
 
-        self.modeGI = drawText(self.scene, QPointF(-380, 410), f"Mode: {self.primaryScale.mode}", size=20,
-                                   position=Pos.LEFT_CENTER)
-        
         self.chorder.drawChordKey(380, 410)
 
     def drawChromCircle(self, centerPt=QPointF(0,0), dia=600, pen=None):
@@ -1396,7 +1699,7 @@ class MainWindow(QMainWindow):
 
         for anItem in self.chromeCircleGraphics:
             self.scene.removeItem(anItem)
-            del anItem
+            itemPool.release(anItem)
         self.chromeCircleGraphics = []
 
         r = dia / 2
@@ -1466,6 +1769,7 @@ class MainWindow(QMainWindow):
                                 chordTextDepthFactor=0.50)
 
     def print(self):
+        from PyQt6.QtPrintSupport import QPrinter, QPrintDialog
         printer = QPrinter()
         dialog = QPrintDialog(printer, self)
         if dialog.exec() == QPrintDialog.DialogCode.Accepted:
@@ -1499,7 +1803,68 @@ class MainWindow(QMainWindow):
         Plays the scale on fluid synth
         :return:
         '''
-        self.primaryScale.playScale(self.midiPortName, self.midiProgNum, self.midiTempo, self.midiNumOctaves, self.midiPattern)
+        self.pause_action.setText("Pause")
+        if self.midiChordPlay == ChordPlay.OFF:
+            self.primaryScale.playScale(self.midiPlayer, self.midiPorts, self.midiPortName, self.midiProgNum,
+                                        self.midiTempo, self.midiNumOctaves, self.midiPattern)
+        else:
+            self.primaryScale.playChords(self.midiPlayer, self.midiPorts, self.midiPortName, self.midiProgNum,
+                                         self.midiTempo, self.chorder.level, self.midiChordPlay,
+                                         self.midiChordChannels)
+
+    def exportMidi(self):
+        '''
+        Writes the primary scale, played with the MIDI settings, to a .mid file
+        '''
+        if not self.primaryScale.key:
+            dialog = QMessageBox(parent=self, text="You must select a key first")
+            dialog.setWindowTitle("Message")
+            dialog.exec()
+            return
+        fileNameInfo = QFileDialog.getSaveFileName(self, "Export MIDI File", "~", "MIDI Files (*.mid)")
+        if len(fileNameInfo[0]) == 0:
+            return
+        fileName = fileNameInfo[0] if fileNameInfo[0].endswith(".mid") else fileNameInfo[0] + ".mid"
+        from midiexport import scaleMidiFile
+        scaleMidiFile(self.primaryScale, self.midiProgNum, self.midiTempo, self.midiNumOctaves,
+                      self.midiPattern).save(fileName)
+
+    def pausePlaying(self):
+        if self.midiPlayer.isPaused:
+            self.midiPlayer.resume()
+            self.pause_action.setText("Pause")
+        elif self.midiPlayer.isPlaying:
+            self.midiPlayer.pause()
+            self.pause_action.setText("Resume")
+
+    def stopPlaying(self):
+        self.midiPlayer.stop()
+        self.pause_action.setText("Pause")
+
+    def changeMidiPort(self, portName, reopen=False):
+        '''
+        Makes portName the MIDI output, closing the last one and opening portName ahead of the next play.
+        param reopen: open portName again even if it is the current port
+        '''
+        if not portName or (portName == self.midiPortName and not reopen and portName in self.midiPorts):
+            return
+        self.midiPlayer.stop()
+        self.midiPorts.close(self.midiPortName)
+        self.midiPortName = portName
+        try:
+            self.midiPorts.reopen(portName)
+        except Exception as err:
+            logger.warning(f"MIDI port {portName} could not be opened: {err}")
+
+    def playProgress(self, played, numOfNotes):
+        self.statusBar().showMessage(f"Playing {self.primaryScale.key} {self.primaryScale.mode}: "
+                                     f"note {played} of {numOfNotes}")
+
+    def playFinished(self):
+        self.pause_action.setText("Pause")
+        jitter = self.midiPlayer.jitter
+        self.statusBar().showMessage(f"Played {jitter['events']} MIDI events, timing jitter mean {jitter['mean']:.2f} ms "
+                                     f"max {jitter['max']:.2f} ms", 5000)
 
     def randomrun(self):
         # setRef
@@ -1521,7 +1886,7 @@ class MainWindow(QMainWindow):
         newScale.mode = newMode
         newKey = random.choice(Scale.allKeys[1:])
         newScale.key = newKey
-        self.primaryScale.deleteGraphicItems()
+        newScale.takeGraphicItems(self.primaryScale)
         self.primaryScale = newScale
 
         self.drawScale()
@@ -1533,19 +1898,45 @@ class MainWindow(QMainWindow):
 
 
 
-if __name__ == '__main__':
+def main(argv=None):
+    '''
+    Runs Scale Smithy, the scalesmithy console script.  Returns the exit status.
+    param argv: the command line arguments, default sys.argv[1:]
+    '''
+    # --tname modulename
+    # --tfunc methodname
+    # --tlines 52,54
+    args = parse_args(argv)
+
+    # Process the lines argument
+    lines = [int(line.strip()) for line in args.tlines.split(",")] if args.tlines else None
+
+    # Setup logger with dynamic filtering
+    setup_logger(
+            log_level=args.log_level,
+            filter_params={
+                "tname": args.tname,
+                "tfunc": args.tfunc,
+                "tlines": lines,  },  )
+    if args.profile_startup:
+        # already enabled at import if this process is scalesmithy, else the import times are missing
+        profiler.enable()
 
     # You need one (and only one) QApplication instance per application.
-    # Pass in sys.argv to allow command line arguments for your app.
-    # If you know you won't use command line arguments QApplication([]) works too.
-    app = QApplication([])
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    profiler.mark("QApplication")
 
     # Create a Qt widget, which will be our window.
 
     window = MainWindow(args)
     window.show()  # IMPORTANT!!!!! Windows are hidden by default.
+    if args.profile_startup:
+        FirstPaintProfiler(window.view.viewport(), args.profile_startup)
 
     # Start the event loop.
-    app.exec()
+    # Your application won't return from here until you exit and the event loop has stopped.
+    return app.exec()
+
 
-    # Your application won't reach here until you exit and the event  # loop has stopped.
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+'''
+settingsstore saves the preferences and scale families as they are changed instead of all of them when the
+window closes, so an edit is not lost if scalesmithy does not exit cleanly.  Only the changed preference keys and
+families are kept, and they are written on a background thread once no change was made for delay seconds.
+The preferences go to QSettings, whose sync() writes a temporary file and renames it over the settings file.
+The scale library is written as follows:
+    - a write with only preference changes leaves it alone
+    - the changed and deleted families are appended to its journal (scalelibrary.appendJournal), which costs as
+      much as the changes and not as the library
+    - when the journal would grow past journalRatio of the library, or all families were replaced, the whole
+      library is written again (scalelibrary.saveLibrary, a temporary file renamed over it) and the journal is
+      removed.  With the default ratio a byte of changes costs about 5 bytes of writes over time.
+'''
+import logging
+import os
+import threading
+
+from PyQt6.QtCore import QSettings
+
+from scalelibrary import appendJournal, journalFile, packJournalRecord, saveLibrary
+
+logger = logging.getLogger(__name__)
+
+# pending value of a QSettings key that is removed
+removeKey = object()
+
+# the library is written again when its journal is larger than this part of it, or than journalMinBytes
+journalRatio = 0.25
+journalMinBytes = 64 * 1024
+
+
+class SettingsStore:
+    '''
+    param settingsArgs: the QSettings arguments, EX: ("santabayanian", "ScaleSmithy"), every write opens its own
+                        QSettings on the writer thread
+    param libraryFile: the scale library file
+    param savedScales: the scale families as they are in libraryFile, {} if it was not read
+    param delay: seconds without a change before the changes are written
+    '''
+    def __init__(self, settingsArgs, libraryFile, savedScales, delay=2.0):
+        self.settingsArgs = settingsArgs
+        self.libraryFile = libraryFile
+        self.delay = delay
+        self._saved = dict(savedScales)
+        self._libraryBytes = self._fileBytes(libraryFile)
+        self._journalBytes = self._fileBytes(journalFile(libraryFile))
+        self._prefs = {}
+        self._families = {}
+        self._replaceScales = None
+        self._lock = threading.Lock()
+        self._writing = threading.Lock()
+        self._timer = None
+
+    @property
+    def isDirty(self):
+        with self._lock:
+            return bool(self._prefs or self._families or self._replaceScales is not None)
+
+    def setValue(self, key, value):
+        '''key is a QSettings key with its group, EX: "midi/midiTempo"'''
+        with self._lock:
+            self._prefs[key] = value
+        self._schedule()
+
+    def remove(self, key):
+        self.setValue(key, removeKey)
+
+    def setFamily(self, name, scaleDef):
+        '''name was added or changed to scaleDef, [firstModeIntervals, modeNames]'''
+        with self._lock:
+            self._families[name] = [list(scaleDef[0]), list(scaleDef[1])]
+        self._schedule()
+
+    def setFamilies(self, scales):
+        '''setFamily of every family of scales, with one restart of the debounce timer'''
+        with self._lock:
+            for name, scaleDef in scales.items():
+                self._families[name] = [list(scaleDef[0]), list(scaleDef[1])]
+        self._schedule()
+
+    def deleteFamily(self, name):
+        with self._lock:
+            self._families[name] = None
+        self._schedule()
+
+    def replaceFamilies(self, scales):
+        '''all the families were replaced by scales'''
+        with self._lock:
+            self._replaceScales = {name: [list(scaleDef[0]), list(scaleDef[1])] for name, scaleDef in scales.items()}
+            self._families = {}
+        self._schedule()
+
+    def _schedule(self):
+        # debounce: the changes are written delay seconds after the last one
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        '''
+        Writes the pending changes on the calling thread, after a write that is still running.  Returns False if
+        they could not be written, they stay pending and are tried again with the next change or flush.
+        '''
+        with self._writing:
+            with self._lock:
+                prefs, self._prefs = self._prefs, {}
+                families, self._families = self._families, {}
+                replaceScales, self._replaceScales = self._replaceScales, None
+            if not (prefs or families or replaceScales is not None):
+                return True
+            # the library first, the removal of the scales array of earlier versions waits for it
+            if families or replaceScales is not None:
+                try:
+                    record = packJournalRecord(families) if replaceScales is None and self._libraryBytes else None
+                    if record is not None and (self._journalBytes + len(record) <=
+                                               max(journalMinBytes, journalRatio * self._libraryBytes)):
+                        self._journalBytes = appendJournal(self.libraryFile, record)
+                        self._applyFamilies(self._saved, families)
+                        logger.info(f"Scale families saved: {len(families)} changed, journal "
+                                    f"{self._journalBytes} bytes")
+                    else:
+                        scales = dict(self._saved) if replaceScales is None else replaceScales
+                        self._applyFamilies(scales, families)
+                        saveLibrary(self.libraryFile, scales)
+                        self._saved = scales
+                        self._libraryBytes = os.path.getsize(self.libraryFile)
+                        self._journalBytes = 0
+                        logger.info(f"Scale library written: {len(families)} changed"
+                                    f"{', all replaced' if replaceScales is not None else ''}")
+                except (OSError, ValueError) as err:
+                    logger.error(f"Scale library {self.libraryFile} not saved: {err}")
+                    self._requeue(prefs, families, replaceScales)
+                    return False
+            if prefs:
+                settings = QSettings(*self.settingsArgs)
+                for key, value in prefs.items():
+                    if value is removeKey:
+                        settings.remove(key)
+                    else:
+                        settings.setValue(key, value)
+                settings.sync()
+                if settings.status() != QSettings.Status.NoError:
+                    logger.error(f"Settings {settings.fileName()} not saved: {settings.status()}")
+                    self._requeue(prefs, {}, None)
+                    return False
+                logger.info(f"Settings saved: {', '.join(prefs)}")
+            return True
+
+    @staticmethod
+    def _fileBytes(fileName):
+        return os.path.getsize(fileName) if os.path.exists(fileName) else 0
+
+    @staticmethod
+    def _applyFamilies(scales, families):
+        for name, scaleDef in families.items():
+            if scaleDef is None:
+                scales.pop(name, None)
+            else:
+                scales[name] = scaleDef
+
+    def _requeue(self, prefs, families, replaceScales):
+        # the failed changes are pending again unless a newer change was made meanwhile
+        with self._lock:
+            self._prefs = {**prefs, **self._prefs}
+            if replaceScales is not None and self._replaceScales is None:
+                self._replaceScales = replaceScales
+                self._families = {**families, **self._families}
+            elif self._replaceScales is None:
+                self._families = {**families, **self._families}
+
+    def close(self):
+        '''stops the debounce timer and writes the pending changes now'''
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        return self.flush()
@@ -3,7 +3,9 @@ from setuptools import setup, find_packages
 setup(
         name='scalesmithy',
         version='0.1.0',
-        py_modules=['musicalclasses', 'utils'],
+        py_modules=['scalecore', 'scalematrix', 'textlayout', 'midiplayer', 'midiexport', 'musicalclasses', 'utils',
+                    'scalelibrary', 'scaleimport', 'settingsstore', 'logutils', 'startupprofile', 'scalesmithy'],
+        entry_points={'console_scripts': ['scalesmithy = scalesmithy:main']},
        # packages=[''],  #         packages=find_packages('.'),
         url='https://github.com/KeithSBB/Scale_Smithy',
         license='TBD',
@@ -17,7 +19,8 @@ setup(
             "Programming Language :: Python :: 3.11"],
         keywords="music, music theory, scales, chords, composition",
         python_requires=">=3.11, <4",
-        install_requires=['pyQt6', 'mido']
+        install_requires=['pyQt6', 'mido'],
+        extras_require={'batch': ['numpy']}
 )
 
 
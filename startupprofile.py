@@ -0,0 +1,121 @@
+'''
+startupprofile records where the startup time of scalesmithy goes: the import time of every module, like
+python -X importtime, the phases of the startup and the time to the first paint.  The report is written as
+JSON so the startup of two releases can be compared:
+
+    python scalesmithy.py --profile-startup startup.json
+
+The module has no dependencies so it can be enabled before Qt is imported.  While disabled the phase and mark
+calls do nothing.
+'''
+import json
+import logging
+import platform
+import sys
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# report format version, changed when fields change meaning
+reportVersion = 1
+
+
+class StartupProfile:
+    '''
+    imports has a {'module', 'self_us', 'cumulative_us', 'depth'} dict per module imported while enabled, in the
+    order the imports finished, like the lines of -X importtime.  phases has a {'name', 'start_ms', 'duration_ms'}
+    dict per phase, marks the ms of each mark, all from the time the profile was enabled.
+    '''
+    def __init__(self):
+        self.enabled = False
+        self.imports = []
+        self.phases = []
+        self.marks = {}
+        self._start = 0.0
+        self._open = {}
+        self._nested = []
+        self._findAndLoad = None
+
+    def enable(self):
+        '''starts the clock and the import timing'''
+        if self.enabled:
+            return
+        self.enabled = True
+        self._start = time.perf_counter()
+        # every import of a module not yet in sys.modules goes through _find_and_load, which is where
+        # -X importtime times them too
+        import importlib._bootstrap as bootstrap
+        self._findAndLoad = bootstrap._find_and_load
+        bootstrap._find_and_load = self._timedFindAndLoad
+
+    def stopImports(self):
+        '''stops the import timing, the imports after the startup are left out'''
+        if self._findAndLoad is not None:
+            import importlib._bootstrap as bootstrap
+            bootstrap._find_and_load = self._findAndLoad
+            self._findAndLoad = None
+
+    def _timedFindAndLoad(self, name, importFunc):
+        depth = len(self._nested)
+        self._nested.append(0.0)
+        t0 = time.perf_counter()
+        try:
+            return self._findAndLoad(name, importFunc)
+        finally:
+            elapsed = time.perf_counter() - t0
+            nested = self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+            self.imports.append({'module': name, 'self_us': round(1e6 * (elapsed - nested)),
+                                 'cumulative_us': round(1e6 * elapsed), 'depth': depth})
+
+    def _ms(self, t):
+        return round(1000 * (t - self._start), 3)
+
+    def begin(self, name):
+        if self.enabled:
+            self._open[name] = time.perf_counter()
+
+    def end(self, name):
+        if self.enabled and name in self._open:
+            t0 = self._open.pop(name)
+            self.phases.append({'name': name, 'start_ms': self._ms(t0),
+                                'duration_ms': round(1000 * (time.perf_counter() - t0), 3)})
+
+    @contextmanager
+    def phase(self, name):
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def mark(self, name):
+        if self.enabled:
+            self.marks[name] = self._ms(time.perf_counter())
+
+    def report(self):
+        '''returns the profile as a dict ready for json'''
+        return {'version': reportVersion,
+                'python': platform.python_version(),
+                'platform': sys.platform,
+                'argv': sys.argv,
+                'import_total_ms': round(sum(entry['cumulative_us'] for entry in self.imports
+                                             if entry['depth'] == 0) / 1000, 3),
+                'imports': self.imports,
+                'phases': sorted(self.phases, key=lambda aphase: aphase['start_ms']),
+                'marks': self.marks}
+
+    def write(self, fileName):
+        '''writes the report to fileName, - writes it to stdout'''
+        if fileName == '-':
+            json.dump(self.report(), sys.stdout, indent=1)
+            sys.stdout.write('\n')
+        else:
+            with open(fileName, 'w') as fp:
+                json.dump(self.report(), fp, indent=1)
+            logger.info(f"startup profile written to {fileName}")
+
+
+profiler = StartupProfile()
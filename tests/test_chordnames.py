@@ -0,0 +1,82 @@
+'''
+The chord names of known chords, in each chord level and symbology, as the Chorder of earlier versions named
+them.  The positions are the semitones of the scale from the degree, up to the octave, as
+Scale.getModeDegRelPositions gives them.
+'''
+import pytest
+
+from scalecore import ChordLevel, ChordNamer, ChordSymbol
+
+delta = '<span class="music-symbol" style="font-family: Arial Unicode MS, Lucida Sans Unicode;">Δ</span>'
+
+major = [0, 4, 7, 12]
+minor7 = [0, 3, 7, 10, 12]
+diminished = [0, 3, 6, 12]
+diminished7 = [0, 3, 6, 9, 12]
+augmented = [0, 4, 8, 12]
+mixolydian = [0, 2, 4, 5, 7, 9, 10, 12]
+aeolian = [0, 2, 3, 5, 7, 8, 10, 12]
+locrian = [0, 1, 3, 5, 6, 8, 10, 12]
+
+basic = ChordLevel.BASIC_ACCORD
+advanced = ChordLevel.ADV_ACCORD
+allChords = ChordLevel.ALL
+
+chordNameCases = [
+    # level, positions, RAW names, JAZZ names, COMMON names
+    (ChordLevel.OFF, major, [], [], []),
+    (ChordLevel.OFF, mixolydian, [], [], []),
+    (basic, major, ['maj'], [delta], ['maj']),
+    (basic, minor7, ['min'], ['-'], ['min']),
+    (basic, diminished, ['dim'], ['<sup>o</sup>'], ['dim']),
+    (basic, diminished7, ['dim'], ['<sup>o</sup>'], ['dim']),
+    (basic, augmented, [], [], []),
+    (basic, mixolydian, ['7', 'maj'], ['7', delta], ['7', 'maj']),
+    (basic, aeolian, ['min'], ['-'], ['min']),
+    (basic, locrian, ['dim'], ['<sup>o</sup>'], ['dim']),
+    (advanced, major, ['maj'], [delta], ['maj']),
+    (advanced, minor7, ['min'], ['-'], ['min']),
+    (advanced, diminished, ['dim'], ['<sup>o</sup>'], ['dim']),
+    (advanced, augmented, ['aug'], ['<sup>+</sup>'], ['aug']),
+    (advanced, mixolydian, ['7', 'maj', '7sus2'], ['7', delta, '7sus2'], ['7', 'maj', '7sus2']),
+    (allChords, major, ['maj'], [delta], ['maj']),
+    (allChords, minor7, ['min', 'm7', 'm7/R+10'], ['-', 'm7', 'm7/R+10'], ['min', 'm7', 'm7/R+10']),
+    (allChords, diminished, ['dim', 'm(-5)'], ['<sup>o</sup>', 'm(-5)'], ['dim', 'm(-5)']),
+    (allChords, diminished7, ['dim', 'm(-5)', 'dim7'], ['<sup>o</sup>', 'm(-5)', '<sup>o</sup>7'],
+     ['dim', 'm(-5)', 'dim7']),
+    (allChords, augmented, ['aug'], ['<sup>+</sup>'], ['aug']),
+    (allChords, locrian,
+     ['dim', 'm(-5)', 'm(-5, m6)', 'm(+5)', 'm7(-5)', 'm7(-5)/R+3', 'm7(-5)/R+6', 'm7(-5)/R+10', 'm7(-5, m6)'],
+     ['<sup>o</sup>', 'm(-5)', 'm(-5, m6)', 'm(+5)', 'm7(-5)', 'm7(-5)/R+3', 'm7(-5)/R+6', 'm7(-5)/R+10',
+      'm7(-5, m6)'],
+     ['dim', 'm(-5)', 'm(-5, m6)', 'm(+5)', 'm7(-5)', 'm7(-5)/R+3', 'm7(-5)/R+6', 'm7(-5)/R+10', 'm7(-5, m6)']),
+]
+
+
+@pytest.mark.parametrize("level, positions, raw, jazz, common", chordNameCases)
+def test_chord_names(level, positions, raw, jazz, common):
+    for symbology, names in ((ChordSymbol.RAW, raw), (ChordSymbol.JAZZ, jazz), (ChordSymbol.COMMON, common)):
+        chordNames, hoverText = ChordNamer(symbology, level).getChordNames('C', positions)
+        assert chordNames == ['<p>C </p>'] + names, symbology
+        assert len(hoverText) == len(chordNames) and hoverText[0] == ''
+
+
+def test_mixolydian_all_chords():
+    chordNames, hoverText = ChordNamer(ChordSymbol.RAW, allChords).getChordNames('G', mixolydian)
+    assert chordNames == ['<p>G </p>', 'maj', '7', '7/R+10', '7sus2', '9(≠3)', '6', '6/R+4', '6/R+7', '6/R+9',
+                          '7(13)', '9', '9/R+2', '9/R+7', '9sus4', '11', '13', '13/R+4', '13', '13', '13(≠3)',
+                          '13(≠3)']
+    assert hoverText[:4] == ['', 'R, maj', 'R, sev, (maj)\nR, dim+1, (maj)', 'R+10, maj+2']
+
+
+def test_hover_text():
+    chordNames, hoverText = ChordNamer(ChordSymbol.JAZZ, allChords).getChordNames('C', diminished7)
+    assert hoverText == ['', 'R, dim\nR, dim-3\nR_, dim+1', 'R, dim-3\nR_, dim+1',
+                         'R, dim-3, dim\nR_, dim-2, (dim+1)\nR_, dim-2, (dim-5)']
+
+
+def test_symbology_change_renames():
+    namer = ChordNamer(ChordSymbol.RAW, basic)
+    assert namer.getChordNames('C', major)[0] == ['<p>C </p>', 'maj']
+    namer.symbology = ChordSymbol.JAZZ
+    assert namer.getChordNames('C', major)[0] == ['<p>C </p>', delta]
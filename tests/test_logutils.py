@@ -0,0 +1,35 @@
+import logging
+
+from logutils import APP_LOGGERS, SpecificLogFilter, setup_logger
+
+
+def appFilters(name):
+    return [afilter for afilter in logging.getLogger(name).filters if isinstance(afilter, SpecificLogFilter)]
+
+
+def test_tname_skips_other_modules_before_the_record():
+    try:
+        setup_logger(logging.DEBUG, {"tname": "scalecore", "tfunc": None, "tlines": None})
+        assert logging.getLogger("scalecore").isEnabledFor(logging.DEBUG)
+        assert not logging.getLogger("utils").isEnabledFor(logging.DEBUG)
+        assert logging.getLogger("utils").isEnabledFor(logging.INFO)
+        # libraries keep the root level
+        assert logging.getLogger("mido").isEnabledFor(logging.DEBUG)
+        setup_logger(logging.DEBUG, {"tname": None, "tfunc": "drawText", "tlines": None})
+        assert logging.getLogger("utils").isEnabledFor(logging.DEBUG)
+        assert all(len(appFilters(name)) == 1 for name in APP_LOGGERS)
+        assert not appFilters("mido")
+    finally:
+        setup_logger(logging.WARNING, {})
+    assert not any(appFilters(name) for name in APP_LOGGERS)
+    assert not logging.getLogger("scalecore").isEnabledFor(logging.INFO)
+
+
+def test_function_filter():
+    afilter = SpecificLogFilter(target_func="drawText", target_lines=[10, 12])
+    record = logging.LogRecord("utils", logging.DEBUG, "utils.py", 10, "msg", None, None, func="drawText")
+    assert afilter.filter(record)
+    record.lineno = 11
+    assert not afilter.filter(record)
+    record.lineno, record.funcName = 12, "setText"
+    assert not afilter.filter(record)
@@ -0,0 +1,84 @@
+import pytest
+
+pytest.importorskip("mido")
+
+from midiplayer import scheduleChords, scheduleNotes
+from scalecore import MidiPattern, noteSequence
+
+diatonicPositions = (0, 2, 4, 5, 7, 9, 11, 12)
+turnaround = MidiPattern.LINEAR_UP | MidiPattern.LINEAR_DOWN
+
+
+def noteOffBeforeNoteOn(events):
+    # every note_on of a note comes after the note_off of its previous note_on
+    sounding = set()
+    for when, msg in events:
+        key = (msg.channel, msg.note)
+        if msg.type == 'note_on':
+            if key in sounding:
+                return False
+            sounding.add(key)
+        else:
+            sounding.discard(key)
+    return True
+
+
+@pytest.mark.parametrize("octaves", [1, 2, 3])
+def test_repeated_note_off_first_at_every_tempo(octaves):
+    notes = noteSequence(diatonicPositions, 60, octaves, turnaround)
+    for tempo in range(20, 221):
+        events = scheduleNotes(notes, 60 / tempo)
+        assert noteOffBeforeNoteOn(events), tempo
+        times = [when for when, msg in events]
+        assert times == sorted(times)
+
+
+def test_note_off_at_next_note_on():
+    events = scheduleNotes([84, 84], 60 / 41)
+    assert [(msg.type, msg.note) for when, msg in events] == [('note_on', 84), ('note_off', 84),
+                                                               ('note_on', 84), ('note_off', 84)]
+    assert events[1][0] == events[2][0]
+
+
+def test_repeated_chord_note_off_first_at_every_tempo():
+    for tempo in range(20, 221):
+        events = scheduleChords([(60, 64, 67), (60, 64, 67), (60, 65, 69)], 60 / tempo)
+        assert noteOffBeforeNoteOn(events), tempo
+        assert len({when for when, msg in events}) == 4, tempo
+
+
+def test_gate():
+    events = scheduleNotes([60, 62], 0.5, gate=0.5)
+    assert [when for when, msg in events] == [0.0, 0.25, 0.5, 0.75]
+
+
+class FakePort:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, msg):
+        self.sent.append(msg)
+
+    def close(self):
+        pass
+
+
+def test_stop_while_paused():
+    from midiplayer import MidiPlayer
+    player = MidiPlayer()
+    port = FakePort()
+    player.play(port, [60, 62, 64], 0.2)
+    player.pause()
+    assert player.isPaused
+    player.stop()
+    assert not player.isPaused and not player.isPlaying
+    # the next pause click pauses again
+    player.play(port, [60, 62, 64], 0.2)
+    player.pause()
+    assert player.isPaused
+    player.resume()
+    assert not player.isPaused
+    player.stop()
+    player.pause()
+    player.stop()
+    assert not player.isPaused
@@ -0,0 +1,65 @@
+'''
+The scale degree and midi note sequences of the MidiPatterns, including the thirds and arpeggios of the top
+degrees, which go above the top root, and the descending patterns, which start above it.
+'''
+import pytest
+
+from scalecore import MidiPattern, degreeSequence, noteSequence
+
+# major pentatonic, 5 degrees: C D E G A C
+pentatonic = [0, 2, 4, 7, 9, 12]
+ionian = [0, 2, 4, 5, 7, 9, 11, 12]
+middleC = 60
+
+
+def test_linear():
+    assert degreeSequence(5, 1, MidiPattern.LINEAR_UP) == [0, 1, 2, 3, 4, 5]
+    assert degreeSequence(5, 1, MidiPattern.LINEAR_UP | MidiPattern.LINEAR_DOWN) == \
+        [0, 1, 2, 3, 4, 5, 5, 4, 3, 2, 1, 0]
+    assert noteSequence(pentatonic, middleC, 2, MidiPattern.LINEAR_UP) == \
+        (60, 62, 64, 67, 69, 72, 74, 76, 79, 81, 84)
+
+
+def test_pattern_up_top_third_above_the_root():
+    assert degreeSequence(5, 1, MidiPattern.PATTERN_UP) == [0, 2, 1, 3, 2, 4, 3, 5, 4, 6, 5]
+    assert noteSequence(pentatonic, middleC, 1, MidiPattern.PATTERN_UP) == \
+        (60, 64, 62, 67, 64, 69, 67, 72, 69, 74, 72)
+
+
+def test_pattern_down_starts_above_the_root():
+    assert noteSequence(pentatonic, middleC, 1, MidiPattern.PATTERN_DOWN) == \
+        (76, 72, 74, 69, 72, 67, 69, 64, 67, 62, 64, 60)
+
+
+def test_arpeggios_of_a_5_degree_mode():
+    # the 7 degree reach of an arpeggio from the top degrees of a 5 note mode goes into the next octaves
+    assert noteSequence(pentatonic, middleC, 1, MidiPattern.ARPEGGIO_UP) == \
+        (60, 64, 69, 62, 67, 72, 64, 69, 74, 67, 72, 76, 69, 74, 79, 72, 76, 81)
+    assert noteSequence(pentatonic, middleC, 1, MidiPattern.ARPEGGIO_DOWN) == \
+        (81, 76, 72, 79, 74, 69, 76, 72, 67, 74, 69, 64, 72, 67, 62, 69, 64, 60)
+
+
+def test_three_octaves_top_degrees():
+    # these read past the end of the old 3 octave lists (IndexError) or wrapped to negative indexes
+    assert noteSequence(ionian, middleC, 3, MidiPattern.PATTERN_UP)[-3:] == (95, 98, 96)
+    assert noteSequence(ionian, middleC, 3, MidiPattern.ARPEGGIO_UP)[-3:] == (96, 100, 103)
+    assert noteSequence(ionian, middleC, 3, MidiPattern.PATTERN_DOWN)[:4] == (100, 96, 98, 95)
+    assert noteSequence(ionian, middleC, 3, MidiPattern.ARPEGGIO_DOWN)[:3] == (103, 100, 96)
+
+
+@pytest.mark.parametrize("octaves", [1, 2, 3])
+@pytest.mark.parametrize("pattern", [MidiPattern.LINEAR_UP, MidiPattern.LINEAR_DOWN, MidiPattern.PATTERN_UP,
+                                     MidiPattern.PATTERN_DOWN, MidiPattern.ARPEGGIO_UP,
+                                     MidiPattern.ARPEGGIO_DOWN])
+def test_no_note_below_the_key(octaves, pattern):
+    for positions in (pentatonic, ionian):
+        notes = noteSequence(positions, middleC, octaves, pattern)
+        assert min(notes) == middleC
+        assert middleC + 12 * octaves in notes
+
+
+def test_pattern_order():
+    both = MidiPattern.LINEAR_UP | MidiPattern.ARPEGGIO_DOWN
+    assert noteSequence(pentatonic, middleC, 1, both) == \
+        noteSequence(pentatonic, middleC, 1, MidiPattern.LINEAR_UP) + \
+        noteSequence(pentatonic, middleC, 1, MidiPattern.ARPEGGIO_DOWN)
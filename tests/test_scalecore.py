@@ -0,0 +1,41 @@
+import pytest
+
+import scalecore
+from scalecore import ScaleIndex, notesToMask, rotationPositions, splitNotes, unknownNotes
+
+diatonic = {"Diatonic": [[2, 2, 1, 2, 2, 2, 1],
+                         ["Ionian", "Dorian", "Phrygian", "Lydian", "Mixolydian", "Aeolian", "Locrian"]]}
+
+
+def test_splitNotes():
+    assert splitNotes("c, eb  G,") == ["C", "Eb", "G"]
+    assert splitNotes(" , ") == []
+
+
+@pytest.mark.parametrize("notes, unknown", [("C E G", []), ("c e g", []), ("H C", ["H"]), ("Cb D x", ["Cb", "X"])])
+def test_unknownNotes(notes, unknown):
+    assert unknownNotes(notes) == unknown
+
+
+def test_notesToMask():
+    assert notesToMask("C E G") == 0b10010001
+    assert notesToMask(["C", "E", "G"]) == 0b10010001
+    with pytest.raises(ValueError):
+        notesToMask("C H")
+
+
+def test_findAllMany_bad_fragment():
+    index = ScaleIndex(diatonic)
+    assert index.findAllMany(["c e g"]) == index.findAllMany(["C E G"])
+    with pytest.raises(ValueError):
+        index.findAllMany(["C E G", "H C"])
+    with pytest.raises(ValueError):
+        index.findAllMany([","])
+
+
+def test_rotationPositions_bounded():
+    assert rotationPositions([2, 2, 1, 2, 2, 2, 1])[1] == (0, 2, 3, 5, 7, 9, 10, 12)
+    for indx in range(scalecore.rotationCacheSize + 100):
+        rotationPositions([1] * (indx % 11 + 1) + [indx + 1])
+    assert scalecore._rotationPositions.cache_info().currsize <= scalecore.rotationCacheSize
+    assert rotationPositions([2, 2, 1, 2, 2, 2, 1])[1] == (0, 2, 3, 5, 7, 9, 10, 12)
@@ -0,0 +1,79 @@
+import io
+import json
+
+import pytest
+
+from scaleimport import ScaleImporter, canonicalRotation, iterScaleEntries, validScaleDef
+
+catalog = {"Diatonic": [[2, 2, 1, 2, 2, 2, 1], ["Ionian", "Dorian", "Phrygian", "Lydian", "Mixolydian",
+                                                "Aeolian", "Locrian"]],
+           "Ionian again": [[2, 2, 1, 2, 2, 2, 1], ["Ionian", "Dorian", "Phrygian", "Lydian", "Mixolydian",
+                                                    "Aeolian", "Locrian"]],
+           "Whole tone ♯": [[2, 2, 2, 2, 2, 2], ["Whole tone"]],
+           "number": 12.5,
+           "exponent": -1.5e-3,
+           "flags": [True, False, None],
+           "empty": {}}
+
+
+def entries(data, chunkSize):
+    return [(name, value) for name, value, bytesRead in iterScaleEntries(io.BytesIO(data), chunkSize)]
+
+
+@pytest.mark.parametrize("text", [json.dumps(catalog), json.dumps(catalog, indent=2, ensure_ascii=False),
+                                  '{"a":12.5}', '{"a": -0.25e+10 , "b":7}', '{ }'])
+def test_every_chunk_size(text):
+    data = text.encode('utf-8')
+    expected = list(json.loads(text).items())
+    for chunkSize in range(1, len(data) + 2):
+        assert entries(data, chunkSize) == expected, chunkSize
+
+
+def test_bytes_read():
+    data = json.dumps(catalog).encode('utf-8')
+    assert [bytesRead for name, value, bytesRead in iterScaleEntries(io.BytesIO(data), 16)][-1] <= len(data)
+
+
+@pytest.mark.parametrize("text", ['{"a": [1, 2', '{"a": 12.', '{"a": 1', '{"a"', '{', '[1, 2]', '', '{"a": 1 "b": 2}',
+                                  '{"a": 12.5.3}', '{a: 1}'])
+def test_damaged(text):
+    for chunkSize in (1, 3, 1024):
+        with pytest.raises(ValueError):
+            entries(text.encode('utf-8'), chunkSize)
+
+
+@pytest.mark.parametrize("value, valid", [([[2, 2, 1, 2, 2, 2, 1], ["a"]], True), ([[2, 2], ["a"]], True),
+                                          ([[], ["a"]], False), ([[2, 0], ["a"]], False), ([[2, 256], ["a"]], False),
+                                          ([[2, True], ["a"]], False), ([[2, 2.0], ["a"]], False),
+                                          ([[2], []], False), ([[2], [1]], False), ([[2], ["a"], 3], False),
+                                          (12.5, False), ({}, False)])
+def test_validScaleDef(value, valid):
+    assert (validScaleDef(value) is not None) == valid
+
+
+def test_canonicalRotation():
+    assert canonicalRotation([2, 2, 1, 2, 2, 2, 1]) == canonicalRotation([1, 2, 2, 1, 2, 2, 2]) == (1, 2, 2, 1, 2, 2, 2)
+    assert canonicalRotation([]) == ()
+
+
+def test_importer_counts(tmp_path):
+    fileName = tmp_path / "catalog.json"
+    fileName.write_text(json.dumps(catalog), encoding='utf-8')
+    scales = {"Whole tone": [[2, 2, 2, 2, 2, 2], ["Whole tone"]]}
+    importer = ScaleImporter(str(fileName), scales, chunkSize=7)
+    while not importer.done:
+        scales.update(importer.nextBatch(2))
+    assert list(scales) == ["Whole tone", "Diatonic"]
+    assert (importer.added, importer.duplicates, importer.conflicts, importer.invalid) == (1, 2, 0, 4)
+    assert importer.progress == 1.0
+
+
+def test_importer_truncated(tmp_path):
+    fileName = tmp_path / "catalog.json"
+    fileName.write_text(json.dumps(catalog)[:-20], encoding='utf-8')
+    importer = ScaleImporter(str(fileName), {}, chunkSize=5)
+    with pytest.raises(ValueError):
+        while not importer.done:
+            importer.nextBatch(1)
+    assert importer.done
+    assert importer.added == 2
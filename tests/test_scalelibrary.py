@@ -0,0 +1,148 @@
+import struct
+
+import pytest
+
+from scalelibrary import (appendJournal, applyJournal, journalFile, loadLibrary, packJournalRecord, packLibrary,
+                          saveLibrary, unpackLibrary)
+
+scales = {"Diatonic": [[2, 2, 1, 2, 2, 2, 1],
+                       ["Ionian", "Dorian", "Phrygian", "Lydian", "Mixolydian", "Aeolian", "Locrian"]],
+          "Whole tone": [[2, 2, 2, 2, 2, 2], ["Whole tone"] * 6],
+          "Pelog": [[1, 2, 4, 1, 4], ["Selisir", "Tembung", "Sunaren", "Baro", "Lebeng"]],
+          "Octatonic": [[1, 2, 1, 2, 1, 2, 1, 2], ["Half-whole", "Whole-half"] * 4]}
+
+
+def test_round_trip():
+    assert unpackLibrary(packLibrary(scales)) == scales
+    assert list(unpackLibrary(packLibrary(scales))) == list(scales)
+
+
+def test_empty_library():
+    assert unpackLibrary(packLibrary({})) == {}
+
+
+def test_unicode_names():
+    unicodeScales = {"Maqām Ḥijāz": [[1, 3, 1, 2, 1, 2, 2], ["Ḥijāz", "مقام", "✓", "𝄞", "", "b", "c"]],
+                     "日本 陰旋法": [[1, 4, 2, 1, 4], ["都節", "Ionian", "Dorian", "Phrygian", "Lydian"]]}
+    assert unpackLibrary(packLibrary(unicodeScales)) == unicodeScales
+
+
+def test_save_load(tmp_path):
+    fileName = tmp_path / "lib" / "ScaleSmithy.scales"
+    saveLibrary(str(fileName), scales)
+    assert loadLibrary(str(fileName)) == scales
+    assert not (tmp_path / "lib" / "ScaleSmithy.scales.tmp").exists()
+
+
+def test_pack_rejects_bad_families():
+    with pytest.raises(ValueError):
+        packLibrary({"Big": [[256], ["x"]]})
+    with pytest.raises(ValueError):
+        packLibrary({"Nul\0": [[12], ["x"]]})
+
+
+@pytest.mark.parametrize("cut", [0, 4, 27, 28, 40, -1])
+def test_truncated(cut):
+    data = packLibrary(scales)
+    with pytest.raises(ValueError):
+        unpackLibrary(data[:cut])
+
+
+def test_bad_magic():
+    with pytest.raises(ValueError, match="not a scale library"):
+        unpackLibrary(b'XXXX' + packLibrary(scales)[4:])
+
+
+def test_bad_version():
+    data = bytearray(packLibrary(scales))
+    struct.pack_into('<H', data, 4, 99)
+    with pytest.raises(ValueError, match="version"):
+        unpackLibrary(bytes(data))
+
+
+def test_trailing_data():
+    with pytest.raises(ValueError):
+        unpackLibrary(packLibrary(scales) + b'\0')
+
+
+def test_damaged_columns():
+    data = packLibrary(scales)
+    columnsAt = 28
+    # familyName of the first family past the string table, then its intervalEnd past the interval blob
+    for offset, value in ((columnsAt, 10000), (columnsAt + 4 * len(scales), 10000)):
+        damaged = bytearray(data)
+        struct.pack_into('<I', damaged, offset, value)
+        with pytest.raises(ValueError, match="damaged"):
+            unpackLibrary(bytes(damaged))
+
+
+def test_damaged_strings():
+    data = bytearray(packLibrary(scales))
+    data[-3:] = b'\xff\xfe\xfd'
+    with pytest.raises(ValueError):
+        unpackLibrary(bytes(data))
+
+
+def test_load_errors(tmp_path):
+    empty = tmp_path / "empty.scales"
+    empty.write_bytes(b'')
+    with pytest.raises(ValueError):
+        loadLibrary(str(empty))
+    truncated = tmp_path / "truncated.scales"
+    truncated.write_bytes(packLibrary(scales)[:-5])
+    with pytest.raises(ValueError):
+        loadLibrary(str(truncated))
+    with pytest.raises(OSError):
+        loadLibrary(str(tmp_path / "missing.scales"))
+
+
+def test_journal(tmp_path):
+    fileName = str(tmp_path / "ScaleSmithy.scales")
+    saveLibrary(fileName, scales)
+    libraryBytes = (tmp_path / "ScaleSmithy.scales").read_bytes()
+    appendJournal(fileName, packJournalRecord({"Pelog": None, "Blues": [[3, 2, 1, 1, 3, 2], ["Blues"] * 6]}))
+    appendJournal(fileName, packJournalRecord({"Diatonic": [[2, 2, 1, 2, 2, 2, 1], ["Ionian"] * 7]}))
+    expected = {name: scaleDef for name, scaleDef in scales.items() if name != "Pelog"}
+    expected["Blues"] = [[3, 2, 1, 1, 3, 2], ["Blues"] * 6]
+    expected["Diatonic"] = [[2, 2, 1, 2, 2, 2, 1], ["Ionian"] * 7]
+    assert (tmp_path / "ScaleSmithy.scales").read_bytes() == libraryBytes
+    assert loadLibrary(fileName) == expected
+    saveLibrary(fileName, expected)
+    assert not (tmp_path / "ScaleSmithy.scales.journal").exists()
+    assert loadLibrary(fileName) == expected
+
+
+def test_journal_applied_twice():
+    record = packJournalRecord({"Pelog": None, "Whole tone": [[2] * 6, ["W"] * 6]})
+    once = dict(scales)
+    applyJournal(once, record)
+    twice = dict(once)
+    assert applyJournal(twice, record) == len(record)
+    assert twice == once
+
+
+def test_journal_rejects_bad_families():
+    with pytest.raises(ValueError):
+        packJournalRecord({"Big": [[256], ["x"]]})
+
+
+def test_journal_torn_record(tmp_path):
+    fileName = str(tmp_path / "ScaleSmithy.scales")
+    saveLibrary(fileName, scales)
+    good = packJournalRecord({"Pelog": None})
+    with open(journalFile(fileName), "wb") as fp:
+        fp.write(good + packJournalRecord({"Whole tone": None})[:-3])
+    loaded = loadLibrary(fileName)
+    assert "Pelog" not in loaded and "Whole tone" in loaded
+    # the torn record is cut off so the next append is read
+    assert (tmp_path / "ScaleSmithy.scales.journal").read_bytes() == good
+    appendJournal(fileName, packJournalRecord({"Octatonic": None}))
+    assert set(loadLibrary(fileName)) == {"Diatonic", "Whole tone"}
+
+
+def test_journal_damaged_crc():
+    record = bytearray(packJournalRecord({"Pelog": None}))
+    record[-1] ^= 0xFF
+    applied = dict(scales)
+    assert applyJournal(applied, bytes(record)) == 0
+    assert applied == scales
@@ -0,0 +1,60 @@
+import os
+
+from scalelibrary import journalFile, loadLibrary, saveLibrary
+from settingsstore import SettingsStore
+
+
+def manyScales(numOfFamilies):
+    return {f"Family {indx}": [[1] * 12, [f"Mode {indx} {modeIndx}" for modeIndx in range(12)]]
+            for indx in range(numOfFamilies)}
+
+
+def makeStore(tmp_path, scales):
+    libraryFile = str(tmp_path / "ScaleSmithy.scales")
+    saveLibrary(libraryFile, scales)
+    # the debounce timer never fires in the tests, flush is called instead
+    return SettingsStore(("scalesmithy-tests", "tests"), libraryFile, scales, delay=3600)
+
+
+def test_family_change_is_journaled(tmp_path):
+    scales = manyScales(2000)
+    store = makeStore(tmp_path, scales)
+    libraryStat = os.stat(store.libraryFile)
+    store.setFamily("Family 7", [[2, 2, 1, 2, 2, 2, 1], ["Ionian"] * 7])
+    store.deleteFamily("Family 8")
+    assert store.flush()
+    assert os.stat(store.libraryFile).st_mtime_ns == libraryStat.st_mtime_ns
+    assert os.path.getsize(journalFile(store.libraryFile)) < 200
+    expected = dict(scales)
+    expected["Family 7"] = [[2, 2, 1, 2, 2, 2, 1], ["Ionian"] * 7]
+    del expected["Family 8"]
+    assert loadLibrary(store.libraryFile) == expected
+    store.close()
+
+
+def test_large_journal_rewrites_library(tmp_path):
+    scales = manyScales(200)
+    store = makeStore(tmp_path, scales)
+    store.setFamilies(manyScales(400))
+    assert store.flush()
+    assert not os.path.exists(journalFile(store.libraryFile))
+    assert loadLibrary(store.libraryFile) == manyScales(400)
+    store.close()
+
+
+def test_replace_rewrites_library(tmp_path):
+    store = makeStore(tmp_path, manyScales(50))
+    store.setFamily("Family 1", [[12], ["Octave"]])
+    assert store.flush()
+    assert os.path.exists(journalFile(store.libraryFile))
+    store.replaceFamilies({"Only": [[12], ["Octave"]]})
+    assert store.close()
+    assert not os.path.exists(journalFile(store.libraryFile))
+    assert loadLibrary(store.libraryFile) == {"Only": [[12], ["Octave"]]}
+
+
+def test_nothing_pending(tmp_path):
+    store = makeStore(tmp_path, manyScales(10))
+    assert not store.isDirty
+    assert store.close()
+    assert not os.path.exists(journalFile(store.libraryFile))
@@ -0,0 +1,352 @@
+'''
+textlayout is the Qt free geometry of the chord text layout inside a scale degree's text pentagon
+(see utils.TextPentagonContainer).  The text items are plain float boxes and the pentagon is a tuple of
+float points, so the iterative fitting runs without QPointF, QLineF or scene item calls and only the
+final positions are applied to the GraphicsTextItems.
+The arithmetic is done in the same order as the Qt classes do it so the placements are the same.
+'''
+import json
+import logging
+import math
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+sideNames = ("LeftExpanding", "LeftRadial", "Inner", "RightRadial", "RightExpanding")
+
+
+class TextBox:
+    '''
+    The layout state of one GraphicsTextItem.
+    param x, y: the item pos()
+    param rect: the item boundingRect() as (x, y, w, h) in item coordinates (y is flipped by the item transform)
+    param width: the item idealWidth
+    param ring, col: the ring and column of the last layout (None if not laid out)
+    '''
+    __slots__ = ('x', 'y', 'rect', 'cx', 'cy', 'w', 'h', 'width', 'corners', 'ring', 'col')
+
+    def __init__(self, x, y, rect, width, ring=None, col=None):
+        rx, ry, rw, rh = rect
+        self.x = x
+        self.y = y
+        self.rect = rect
+        # offsets of the center and of the bottomLeft, bottomRight, topRight, topLeft corners from pos
+        self.cx = rx + rw / 2
+        self.cy = -(ry + rh / 2)
+        self.corners = ((rx, -(ry + rh)), (rx + rw, -(ry + rh)), (rx + rw, -ry), (rx, -ry))
+        self.w = rw
+        self.h = rh
+        self.width = width
+        self.ring = ring
+        self.col = col
+
+    def center(self):
+        return self.x + self.cx, self.y + self.cy
+
+    def setCenter(self, px, py):
+        self.x = px - self.cx
+        self.y = py - self.cy
+
+    def centerToEdge(self, refx, refy):
+        '''
+        length from the center to the box edge along the line to refx, refy,
+        see GraphicsTextItem.centerToEdgeTowardsRefPt
+        '''
+        cx, cy = self.center()
+        dx = refx - cx
+        dy = refy - cy
+        if math.hypot(dx, dy) == 0:
+            raise Exception("Same location, refPt must be different than self.centerPos()")
+        ang = math.pi / 2 if dx == 0 else math.fabs(math.atan(dy / dx))
+        if ang > math.fabs(math.atan(self.h / self.w)):
+            rst = (self.h / 2) / math.sin(ang)
+        else:
+            rst = (self.w / 2) / math.cos(ang)
+        return math.fabs(rst)
+
+
+def _isectLine(x1, y1, x2, y2, px, py):
+    # winding contribution of one polygon edge, the scan conversion rule of QPolygonF.containsPoint
+    if abs(y1 - y2) * 1000000000000. <= min(abs(y1), abs(y2)):
+        return 0
+    direction = 1
+    if y2 < y1:
+        x1, x2 = x2, x1
+        y1, y2 = y2, y1
+        direction = -1
+    if y1 <= py < y2 and x1 + ((x2 - x1) / (y2 - y1)) * (py - y1) <= px:
+        return direction
+    return 0
+
+
+def _perpendicularPoint(x1, y1, x2, y2, px, py):
+    # see utils.perpendicular_point_on_line
+    dx, dy = x2 - x1, y2 - y1
+    lengthSq = dx ** 2 + dy ** 2
+    if lengthSq == 0:
+        return x1, y1
+    t = ((px - x1) * dx + (py - y1) * dy) / lengthSq
+    if t < 0 or 1 < t:
+        return None
+    return x1 + t * dx, y1 + t * dy
+
+
+class PentagonLayout:
+    '''
+    Lays out TextBoxes inside a text pentagon, the geometry of TextPentagonContainer.layoutGrphTxtItems.
+    param points: the 6 pentagon points (x, y) clockwise from the scale vertex, the last is the first again
+    param alignPt: the (x, y) leftSideAlignmentPt
+    param alignAngle: the leftSideAlignmentAngle
+    '''
+    def __init__(self, points, alignPt, alignAngle):
+        if len(points) != 6:
+            raise Exception("TextPentagonContainer must have 6 points listed clockwise starting at the scale vertex.  ")
+        self.points = tuple(points)
+        self.sides = tuple((sideNames[i], points[i] + points[i + 1]) for i in range(5))
+        self.alignPt = alignPt
+        self.alignAngle = alignAngle
+        self.alignCos = math.cos(alignAngle)
+        self.alignSin = math.sin(alignAngle)
+
+    def contains(self, px, py):
+        points = self.points
+        winding = 0
+        for i in range(1, 6):
+            winding += _isectLine(*points[i - 1], *points[i], px, py)
+        if points[-1] != points[0]:
+            winding += _isectLine(*points[-1], *points[0], px, py)
+        return winding % 2 != 0
+
+    def closestSide(self, px, py):
+        '''returns the (px, py, x, y) perpendicular line to the closest side and the side name'''
+        minDistance = float('inf')
+        perpLine = None
+        polyside = None
+        for aSide, segment in self.sides:
+            polyPt = _perpendicularPoint(*segment, px, py)
+            if polyPt is None:
+                continue
+            distance = math.hypot(polyPt[0] - px, polyPt[1] - py)
+            if distance < minDistance:
+                minDistance = distance
+                perpLine = (px, py) + polyPt
+                polyside = aSide
+        return perpLine, polyside
+
+    def compliance(self, box):
+        '''
+        returns (contained, polyside, perpLine), perpLine is the (x1, y1, x2, y2) line from the corner
+        of box that is the furthest outside to the polygon side
+        '''
+        perpLine = None
+        polyside = None
+        worsedist = 0
+        for ox, oy in box.corners:
+            px = box.x + ox
+            py = box.y + oy
+            if self.contains(px, py):
+                continue
+            aLine, polyside = self.closestSide(px, py)
+            if aLine is None:
+                continue
+            length = math.hypot(aLine[2] - aLine[0], aLine[3] - aLine[1])
+            if length > worsedist:
+                worsedist = length
+                perpLine = aLine
+        return perpLine is None, polyside, perpLine
+
+    def solve(self, boxes):
+        '''
+        Positions boxes[1:] in rings and columns around boxes[0], which stays where it is.
+        The boxes are changed in place.
+        '''
+        first = boxes[0]
+        first.ring = 0
+        first.col = 0
+
+        newring = True
+        agi = None
+        lastAgi = None
+        indx = 1
+        while indx < len(boxes):
+            # Either re-layout last agi (usually at higher ring) or take the next one
+            if agi is None:
+                agi = boxes[indx]
+
+            if newring:
+                if agi.col == 0:
+                    agi.ring = agi.ring + 1
+                else:
+                    agi.ring = boxes[indx - 1].ring + 1
+                agi.col = 0
+                newring = False
+                if agi.ring > 5:
+                    logger.debug("Too many rings for text item %d, breaking out", indx)
+                    break
+            else:
+                agi.ring = boxes[indx - 1].ring
+                agi.col = boxes[indx - 1].col + 1
+
+            # col 0 starts from the first item of the inner ring towards the alignment point,
+            # otherwise perpendicular to the radial of the last item
+            if agi.col == 0:
+                innerAgi = next((b for b in boxes if b.ring == agi.ring - 1 and b.col == 0), None)
+                if innerAgi is None:
+                    logger.debug("No inner item found for text item %d ring %d", indx, agi.ring)
+                    break
+                agi.setCenter(*innerAgi.center())
+                deltaDist = agi.centerToEdge(*self.alignPt) + innerAgi.centerToEdge(*self.alignPt)
+                agi.x += deltaDist * self.alignCos
+                agi.y += deltaDist * self.alignSin
+            else:
+                candidates = [b for b in boxes if b.ring == agi.ring - 1]
+                lastAgi = boxes[indx - 1]
+                fx, fy = first.center()
+                lx, ly = lastAgi.center()
+                angOfPerpLine = math.atan2(ly - fy, lx - fx) - math.pi / 2
+                distguess = lastAgi.width + agi.width
+                agi.setCenter(distguess * math.cos(angOfPerpLine) + lx, distguess * math.sin(angOfPerpLine) + ly)
+                ax, ay = agi.center()
+                innerAgi = min(candidates, key=lambda b: b.centerToEdge(ax, ay))
+
+            # the iterative fitting
+            trys = 0
+            fit = False
+            while not fit:
+                if trys > 10:
+                    logger.debug("Too many tries for text item %d, breaking out", indx)
+                    break
+                ax, ay = agi.center()
+                ix, iy = innerAgi.center()
+                ideal1 = agi.centerToEdge(ix, iy) + innerAgi.centerToEdge(ax, ay)
+                dpt1 = math.hypot(ix - ax, iy - ay) - ideal1
+                if math.fabs(dpt1) > 1:
+                    a1 = math.atan2(iy - ay, ix - ax)
+                    agi.x += dpt1 * math.cos(a1)
+                    agi.y += dpt1 * math.sin(a1)
+
+                if agi.col == 0:
+                    contained, polyside, actual2 = self.compliance(agi)
+                    dpt2 = 0 if contained else math.hypot(actual2[2] - actual2[0], actual2[3] - actual2[1])
+                else:
+                    ax, ay = agi.center()
+                    lx, ly = lastAgi.center()
+                    ideal2 = agi.centerToEdge(lx, ly) + lastAgi.centerToEdge(ax, ay)
+                    actual2 = (ax, ay, lx, ly)
+                    dpt2 = math.hypot(lx - ax, ly - ay) - ideal2
+
+                if math.fabs(dpt2) > 1:
+                    a2 = math.atan2(actual2[3] - actual2[1], actual2[2] - actual2[0])
+                    agi.x += dpt2 * math.cos(a2)
+                    agi.y += dpt2 * math.sin(a2)
+
+                if math.fabs(dpt1) < 1 and math.fabs(dpt2) < 1:
+                    fit = True
+                trys += 1
+
+            # if it is not inside the pentagon start over in a new ring
+            contained, polyside, actual2 = self.compliance(agi)
+            if contained:
+                indx += 1
+                agi = None
+            elif polyside == "RightExpanding" or polyside == "RightRadial":
+                if agi.col == 0:
+                    logger.debug("Text item %d will not fit on %s side, already col = 0, give up", indx, polyside)
+                    break
+                newring = True
+            else:
+                logger.debug("Text item %d will not fit on %s side", indx, polyside)
+                break
+
+
+class LayoutCache:
+    '''
+    LRU cache of solved PentagonLayouts.  The key is the pentagon, the alignment point and the start
+    state of the boxes (position, rect, ideal width, ring, col) relative to the scale center, so a scale
+    degree drawn again with the same chords at the same place (cycling through keys, modes and families
+    and back) is positioned without running the solver.  The text boxes are not rotated with the degree,
+    so a layout only fits the same vertex angle and the key is not rotated to a canonical angle.
+    param maxsize: the most layouts kept
+    '''
+    version = 2
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._layouts = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._layouts)
+
+    def clear(self):
+        self._layouts.clear()
+
+    def solve(self, layout, boxes, origin=(0.0, 0.0)):
+        '''
+        Positions boxes like layout.solve(boxes), from the cache when possible.
+        param origin: the (x, y) scale center the key and the cached positions are relative to
+        '''
+        ox, oy = origin
+        key = (tuple((x - ox, y - oy) for x, y in layout.points),
+               (layout.alignPt[0] - ox, layout.alignPt[1] - oy, layout.alignAngle),
+               tuple((b.x - ox, b.y - oy, b.rect, b.width, b.ring, b.col) for b in boxes))
+        placements = self._layouts.get(key)
+        if placements is None:
+            self.misses += 1
+            layout.solve(boxes)
+            self._layouts[key] = tuple((b.x - ox, b.y - oy, b.ring, b.col) for b in boxes)
+            if len(self._layouts) > self.maxsize:
+                self._layouts.popitem(last=False)
+        else:
+            self.hits += 1
+            self._layouts.move_to_end(key)
+            for b, (x, y, ring, col) in zip(boxes, placements):
+                b.x = x + ox
+                b.y = y + oy
+                b.ring = ring
+                b.col = col
+
+    def save(self, fileName):
+        '''writes the layouts to fileName as JSON, the tuples become lists'''
+        with open(fileName, "w") as fp:
+            json.dump({'version': self.version, 'layouts': list(self._layouts.items())}, fp)
+
+    def load(self, fileName):
+        '''adds the layouts saved in fileName, a missing, outdated or damaged file is ignored'''
+        try:
+            with open(fileName, "r") as fp:
+                saved = json.load(fp)
+            version = saved['version']
+            if version != self.version:
+                logger.info(f"Layout cache {fileName} is version {version}, ignored")
+                return
+            layouts = [(_tuples(key), _tuples(placements)) for key, placements in saved['layouts']]
+            for key, placements in layouts:
+                if not _validLayout(key, placements):
+                    raise ValueError("not a layout")
+        except (OSError, ValueError, TypeError, KeyError) as err:
+            logger.info(f"Layout cache {fileName} not loaded: {err}")
+            return
+        for key, placements in layouts[-self.maxsize:]:
+            self._layouts[key] = placements
+        while len(self._layouts) > self.maxsize:
+            self._layouts.popitem(last=False)
+
+
+def _tuples(value):
+    # the lists of a json layout back to the tuples of the cache keys and placements
+    return tuple(_tuples(item) for item in value) if isinstance(value, list) else value
+
+
+def _number(value):
+    return type(value) in (int, float)
+
+
+def _validLayout(key, placements):
+    # one (x, y, ring, col) per box of the key, so solve can apply it
+    points, align, boxes = key
+    return (all(len(apoint) == 2 for apoint in points) and len(align) == 3 and len(placements) == len(boxes) and
+            all(len(placement) == 4 and _number(placement[0]) and _number(placement[1]) for placement in placements))
+
+layoutCache = LayoutCache()
@@ -4,9 +4,8 @@ The utils module contains utility functions
 
 
 import math
-from collections import deque
+from collections import OrderedDict, namedtuple
 from enum import Enum
-from math import sqrt
 import logging
 
 from PyQt6 import sip
@@ -14,7 +13,8 @@ from PyQt6.QtCore import Qt, QPointF, QLineF, QRectF
 from PyQt6.QtGui import QFont, QBrush, QPen, QPolygonF, QTransform
 from PyQt6.QtWidgets import QGraphicsTextItem, QGraphicsRectItem, QGraphicsLineItem, QGraphicsEllipseItem, \
     QGraphicsItem, QDialog, QListWidget, QVBoxLayout
-from poetry.console.commands import self
+
+from textlayout import PentagonLayout, TextBox, layoutCache
 
 logger = logging.getLogger(__name__)
 
@@ -108,12 +108,6 @@ def isInsidePolygon(point, polygon):
 
     return crossings % 2 == 1
 
-def Cumulative(lists):
-    cu_list = []
-    length = len(lists)
-    cu_list = [sum(lists[0:x:1]) for x in range(0, length + 1)]
-    return cu_list[1:]
-
 def angleOfLine(line):
     dx = line.p2().x() - line.p1().x()
     dy = line.p2().y() - line.p1().y()
@@ -138,9 +132,8 @@ class Pos(Enum):
 class TextPentagonContainer(QPolygonF):
     '''
     The text pentagon is a five sided polygon that all the
-    GraphicsTextItems for a scale degree must liw within.  It
-    has specialized methods to test for GraphicsTextItem placement
-    compliance and return info to aid in readjusting the position.
+    GraphicsTextItems for a scale degree must liw within.  The
+    items are placed in it by textlayout.PentagonLayout, see layoutGrphTxtItems.
     The pentagon has named sides relative to the scale vertex position
     and increasing clockwise: LeftExpanding, LeftRadial, Inner, RightRadial, RightExpanding
     '''
@@ -154,16 +147,19 @@ class TextPentagonContainer(QPolygonF):
         :param chordTextDepthFactor: float - a fraction less than 1 which controls how far towards centerPt
                                                 the inner pentagon points are placed.
         '''
-        logger.debug("NEW PENTAGON CONTAINER")
-        logger.debug(f"centerPt = {centerPt.x(), centerPt.y()}")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("NEW PENTAGON CONTAINER")
+            logger.debug("centerPt = %s", (centerPt.x(), centerPt.y()))
         self._gTxtItems = None
         self.centerRadial = QLineF(centerPt, vtxPt)
         self.rs = self.centerRadial.length()
         self.a = angleOfLine(self.centerRadial)
 
-        logger.debug(f"a = {math.degrees(self.a)}")
         self.vtxPt = vtxPt
-        logger.debug(f"vtxPt = {vtxPt}")
+        if debug:
+            logger.debug("a = %s", math.degrees(self.a))
+            logger.debug("vtxPt = %s", vtxPt)
         self.centerPt = centerPt
         self.keyPt = QPointF(centerPt.x() + rt * math.cos(self.a), centerPt.y() + rt * math.sin(self.a))
         self.chordTextDepthFactor = chordTextDepthFactor
@@ -171,13 +167,15 @@ class TextPentagonContainer(QPolygonF):
         #relAngCCW = math.radians((180 - relchordtonepos[1] * 30) / 2)
 
         angCW = math.radians(relchordtonepos[1] * 30.0)
-        logger.debug(f"angCW = {math.degrees(angCW)}")
+        if debug:
+            logger.debug("angCW = %s", math.degrees(angCW))
         ptCW = QPointF(self.rs * math.cos(self.a - angCW) + centerPt.x(),
                         self.rs * math.sin(self.a - angCW) + centerPt.y())
         lineToPtCW = QLineF(vtxPt, ptCW )
         halfLengthToCW = 0.5 * lineToPtCW.length() - 3
         relAngToPtCW = angleOfLine(lineToPtCW)
-        logger.debug(f"halfLengthToCCW = {halfLengthToCW}")
+        if debug:
+            logger.debug("halfLengthToCCW = %s", halfLengthToCW)
         ptHlCW = QPointF(vtxPt.x() + halfLengthToCW * math.cos(relAngToPtCW),
                         vtxPt.y() + halfLengthToCW * math.sin(relAngToPtCW))
         ptinCW = QPointF(chordTextDepthFactor * ptHlCW.x() + centerPt.x() ,
@@ -185,13 +183,15 @@ class TextPentagonContainer(QPolygonF):
 
         #relAngCW = math.radians(-(180 - (12 - relchordtonepos[-2]) * 30) / 2)
         angCCW = math.radians((12 - relchordtonepos[-2]) * 30.0)
-        logger.debug(f"angCCW = {math.degrees(angCCW)}")
+        if debug:
+            logger.debug("angCCW = %s", math.degrees(angCCW))
         ptCCW = QPointF(self.rs * math.cos(self.a + angCCW) + centerPt.x(),
                         self.rs * math.sin(self.a + angCCW) + centerPt.y())
         lineToPtCCW = QLineF(vtxPt, ptCCW)
         halfLengthToCCW = 0.5 * lineToPtCCW.length() - 3
         relAngToPtCCW = angleOfLine(lineToPtCCW)
-        logger.debug(f"halfLengthToCW = {halfLengthToCCW}")
+        if debug:
+            logger.debug("halfLengthToCW = %s", halfLengthToCCW)
         ptHlCCW = QPointF(vtxPt.x() + halfLengthToCCW * math.cos(relAngToPtCCW),
                        vtxPt.y() + halfLengthToCCW * math.sin(relAngToPtCCW))
         ptinCCW = QPointF(chordTextDepthFactor * ptHlCCW.x() + centerPt.x(),
@@ -217,53 +217,6 @@ class TextPentagonContainer(QPolygonF):
                         "RightRadial":QLineF(self.value(3), self.value(4)),
                         "RightExpanding":QLineF(self.value(4), self.value(5))}
 
-    def closestPointOnPolygon(self, abadPt):
-        min_distance = float('inf')
-        perpLine = None
-        polyside = None
-        for aSide in self.sides:
-            segment = self.sides[aSide]
-            polyPt = perpendicular_point_on_line(segment, abadPt)
-            if polyPt is None:
-                continue
-            perpendictLine = QLineF(abadPt, polyPt)
-            distance = perpendictLine.length()
-            if distance < min_distance:
-                min_distance = distance
-                perpLine = perpendictLine
-                polyside = aSide
-
-        return perpLine, polyside
-
-    def graphicTxtItemCompliance(self, gti):
-        badPts = []
-        perpLine = None
-        polyside = None
-        for apt in gti.getPoints():
-            if not self.containsPoint(apt, Qt.FillRule.OddEvenFill):
-                #logger.debug(f"bad point {apt} for {gti.toPlainText()}")
-                badPts.append(apt)
-            else:
-                pass
-                #logger.debug(f"Good point {apt} for {gti.toPlainText()}")
-        if len(badPts) > 0:
-            worsedist = 0
-            for abadPt in badPts:
-                # Need to find which side of te polygon
-                # this point is outside
-                aLine, polyside = self.closestPointOnPolygon(abadPt)
-                if aLine is None:
-                    continue
-
-                if aLine.length() > worsedist:
-                    worsedist = aLine.length()
-                    perpLine = aLine
-        if perpLine is None:
-            contained = True
-        else:
-            contained = False
-        return contained, polyside, perpLine
-
     @property
     def gTxtItems(self):
         return self._gTxtItems
@@ -273,159 +226,94 @@ class TextPentagonContainer(QPolygonF):
         self._gTxtItems = q
 
 
-    def getGTxtItems(self, ring, col):
-        rst = []
-        for gti in self.gTxtItems:
-            if gti.ring == ring:
-                if col is not None:
-                    if gti.col == col:
-                        rst.append(gti)
-                else:
-                    rst.append(gti)
-        if len(rst) == 0:
-            rst = [None]
-        return rst
-
     def layoutGrphTxtItems(self):
         '''
         This method lays out the graphic text items.
-        It uses an iterative method after initial positioning
+        The iterative fitting is done by textlayout.PentagonLayout on plain float boxes, or taken from
+        textlayout.layoutCache if the same layout was solved before. Only the final positions are applied to the items.
         '''
-        
-        # The first agi is the scale degree note or roman numeral
-        innerAgi = self._gTxtItems[0]
-        innerAgi.ring = 0
-        innerAgi.col = 0
-        logger.debug(f"======= {innerAgi.toPlainText()} initial position set to {innerAgi.centerPos()}=======")
-        
-        # Layout controls
-        newring = True
-        agi = None
-        indx = 1
-        while indx < len(self._gTxtItems):
-            # Either re-layout last agi (usually at higher ring)
-            # or pop the next agi
-            if agi is None:
-                # Get the next agi to layout
-                agi = self._gTxtItems[indx]
-                agi.polycont = self
-            
-            # set the proper ring and col    
-            if newring:
-                if agi.col == 0:
-                    agi.ring = agi.ring + 1
-                else:
-                    agi.ring = self._gTxtItems[indx-1].ring + 1
-                agi.col = 0
-                newring = False
-                if agi.ring > 5:
-                    logger.debug(f"******* Too many rings for {agi.toPlainText()}, breaking out")
-                    break
-            else:
-                agi.ring = self._gTxtItems[indx-1].ring
-                agi.col = self._gTxtItems[indx-1].col + 1
-          
-            # Calculate the initial position of the next text item
-            # If agi.col == 0 then the innerAgi and the pentagon are the references
-            # otherwise its the lastAgi and the closest inner ring GI
-            if agi.col == 0:
-                innerAgi = self.getGTxtItems(agi.ring - 1, col=0)[0]
-                if innerAgi is None:
-                    logger.debug(f"No innerAgi found for {agi.toPlainText()} ring {agi.ring} col {agi.col}")
-                    break
-                logger.debug(f"innerAgi {innerAgi.toPlainText()} ring {innerAgi.ring} col {innerAgi.col}")
-                agi.setCenterPos(innerAgi.centerPos())
-                logger.debug(f"{agi.toPlainText()} initial position set to {agi.centerPos()} = {innerAgi.centerPos()}")
-                refdist = innerAgi.centerToEdgeTowardsRefPt(self.leftSideAlignmentPt)
-                agiDist = agi.centerToEdgeTowardsRefPt(self.leftSideAlignmentPt)
-                deltaDist = agiDist + refdist
-                dx = deltaDist * math.cos(self.leftSideAlignmentAngle)
-                dy = deltaDist * math.sin(self.leftSideAlignmentAngle)
-                agi.moveBy(dx, dy)
-                logger.debug(f"move by {dx} {dy} for {agi.toPlainText()} in ring {agi.ring} col {agi.col}")
-                col = 1
-            elif agi.col > 0:
-                candidates = self.getGTxtItems(agi.ring - 1, None)
-                for acan in candidates:
-                    logger.debug(f"candidate {acan.toPlainText()} ring {acan.ring} col {acan.col}")
-
-                #Need to first move agi to perpendicular from lastapi
-                lastAgi = self._gTxtItems[indx - 1]
-                lastRadial = QLineF(self._gTxtItems[0].centerPos(), lastAgi.centerPos())
-                angOfPerpLine = angleOfLine(lastRadial) - math.pi / 2
-                distguess = lastAgi.width + agi.width
-                newPos = QPointF(distguess * math.cos(angOfPerpLine)+lastAgi.centerPos().x(),
-                                 distguess * math.sin(angOfPerpLine)+lastAgi.centerPos().y())
-                agi.setCenterPos(newPos)
-
-                #find closest GItem in inner ring
-                innerAgi = min(candidates, key=lambda x: x.centerToEdgeTowardsRefPt(agi.centerPos()))
-                logger.debug(f"innerAgi {innerAgi.toPlainText()} ring {innerAgi.ring} col {innerAgi.col}")
-
-            logger.debug(f"======= {agi.toPlainText()} initial position set to {agi.centerPos()}=======")
-            
-            # == the iterative fitting takes place here in this while loop ==
-            trys = 0
-            fit = False
-            while not fit:
-                if trys > 10:
-                    logger.debug(f"******* Too many tries for {agi.toPlainText()}, breaking out")
-                    break
-                ideal1 = (agi.centerToEdgeTowardsRefPt( innerAgi.centerPos()) +
-                          innerAgi.centerToEdgeTowardsRefPt(agi.centerPos()))
-                actual1 = QLineF(agi.centerPos(), innerAgi.centerPos())
-                dpt1 = (actual1.length() - ideal1)
-                logger.debug(f"ideal1 {ideal1} actual1 {actual1.length()} dpt1 {dpt1}")
-                if math.fabs(dpt1) > 1: #fuzzy compare, if less than one do nothing
-                    a1 = angleOfLine(actual1)
-                    # print(f"refgi1: angle {a1} and move by {dpt1}")
-                    agi.moveBy(dpt1 * math.cos(a1), dpt1 * math.sin(a1))
-                    logger.debug(f"move by {dpt1} for {agi.toPlainText()} in ring {agi.ring} col {agi.col}")
-
-                if agi.col == 0:
-                    contained, polyside, actual2 = self.graphicTxtItemCompliance(agi)
-                    if contained:
-                        dpt2 = 0
-                    else:
-                        dpt2 = actual2.length()
-                        logger.debug(f"Iterative loop: graphical text item {agi.toPlainText()} out on {polyside}")
+        boxes = [TextBox(gti.x(), gti.y(), gti.rect.getRect(), gti.width, gti.ring, gti.col)
+                 for gti in self._gTxtItems]
+        layout = PentagonLayout([(self.value(i).x(), self.value(i).y()) for i in range(self.count())],
+                                (self.leftSideAlignmentPt.x(), self.leftSideAlignmentPt.y()),
+                                self.leftSideAlignmentAngle)
+        layoutCache.solve(layout, boxes, (self.centerPt.x(), self.centerPt.y()))
+        for gti, box in zip(self._gTxtItems, boxes):
+            gti.polycont = self
+            gti.ring = box.ring
+            gti.col = box.col
+            gti.setPos(box.x, box.y)
+            gti.debugBoundingRect()
 
-                else:
-                    ideal2 = (agi.centerToEdgeTowardsRefPt(
-                            lastAgi.centerPos()) + lastAgi.centerToEdgeTowardsRefPt(agi.centerPos()))
-                    actual2 = QLineF(agi.centerPos(), lastAgi.centerPos())
-                    dpt2 = (actual2.length() - ideal2)
-
-                if math.fabs(dpt2) > 1:
-                    a2 = angleOfLine(actual2)
-                    agi.moveBy(dpt2 * math.cos(a2), dpt2 * math.sin(a2))
-                    logger.debug(f"move by {dpt2} for {agi.toPlainText()} in ring {agi.ring} col {agi.col}")
-
-                if math.fabs(dpt1) < 1 and math.fabs(dpt2) < 1:
-                    fit = True
-                trys += 1
-
-            # check if inside pentagon container, if not start over with newring = True
-            contained, polyside, actual2 = self.graphicTxtItemCompliance(agi)
-            if not contained:
-                if polyside is not None:
-                    if polyside == "RightExpanding" or polyside == "RightRadial":
-                        if agi.col == 0:
-                            logger.debug(f">>>>>Item {agi.toPlainText()} will not fit on {polyside} side, already col = 0, give up")
-                            break
-                        else:
-                            newring = True
-                            logger.debug(f">>>>> Item {agi.toPlainText()}will not fit on {polyside} side, going to ring {agi.ring + 1} and try again")
-                    else:
-                        logger.debug(f">>>>>WARNING: Item {agi.toPlainText()} will not fit on {polyside} side")
-                        break
-                else:
-                    logger.debug(f">>>>>ERROR: polyside for item {agi.toPlainText()} could not be determined.")
-                    break
+
+TextMetrics = namedtuple('TextMetrics', ['width', 'height', 'rect'])
+
+
+class TextMetricsCache:
+    '''
+    Process wide cache of the GraphicsTextItem measurements: (text, font key, textWidth) -> TextMetrics
+    (idealWidth, document height and the trimmed bounding rect as an (x, y, w, h) tuple).
+    The font key (QFont.key()) holds the family, point size and weight.  Chord names like 'maj7' are
+    drawn over and over at the same size so the Qt document is only measured the first time, and
+    layout code can get the rectangle of a text with measure() without building an item.  The least
+    recently used measurements are dropped past maxsize, so texts of every key, mode, family and font size
+    do not pile up over a session.
+    param maxsize: the most measurements kept
+    '''
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._metrics = OrderedDict()
+        self._scratch = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._metrics)
+
+    def clear(self):
+        self._metrics.clear()
+
+    def lookup(self, text, font, textWidth=-1):
+        key = (text, font.key(), textWidth)
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._metrics.move_to_end(key)
+        return metrics
+
+    def store(self, text, font, textWidth, qtextItem):
+        '''measures qtextItem, a QGraphicsTextItem showing text in font, and caches the result'''
+        doc = qtextItem.document()
+        rect = QGraphicsTextItem.boundingRect(qtextItem)
+        rect.setHeight(rect.height() - 7)
+        rect.setY(7.5)
+        metrics = TextMetrics(doc.idealWidth(), doc.size().height(),
+                              (rect.x(), rect.y(), rect.width(), rect.height()))
+        self._metrics[(text, font.key(), textWidth)] = metrics
+        if len(self._metrics) > self.maxsize:
+            self._metrics.popitem(last=False)
+        return metrics
+
+    def measure(self, text, font, textWidth=-1):
+        '''returns the TextMetrics of text, measuring it on a scratch item if it is not cached'''
+        metrics = self.lookup(text, font, textWidth)
+        if metrics is None:
+            if self._scratch is None:
+                self._scratch = QGraphicsTextItem()
+            self._scratch.setFont(font)
+            self._scratch.setTextWidth(textWidth)
+            if text[0] == '<':
+                self._scratch.setHtml(text)
             else:
-                logger.debug(f"{agi.toPlainText()} was successfully placed inside pentagon")
-                indx += 1
-                agi = None
+                self._scratch.setPlainText(text)
+            metrics = self.store(text, font, textWidth, self._scratch)
+        return metrics
+
+
+textMetrics = TextMetricsCache()
+
 
 class GraphicsTextItem(QGraphicsTextItem):
     def __init__(self, scene,  text, font, tcolor, parent=None):
@@ -436,19 +324,29 @@ class GraphicsTextItem(QGraphicsTextItem):
         self.setTransform(self.xfm )
         self.setFont(font)
         self.setDefaultTextColor(tcolor)
-        if text[0] == '<':
-            self.setHtml(text)
-        else:
-            self.setPlainText(text)
         self._polycont = None
-        self.width = self.document().idealWidth()
-        self.height = self.document().size().height()
-        self.rect = super().boundingRect()
-        self.rect.setHeight(self.rect.height() - 7)
-        self.rect.setY(7.5)
         self.rectItem = None
         self._ring = None
         self._col = None
+        self.setText(text)
+
+    def setText(self, text):
+        '''sets the (html if it starts with '<') text and measures it'''
+        self.prepareGeometryChange()
+        if text[0] == '<':
+            self.setHtml(text)
+        else:
+            self.setPlainText(text)
+        font = self.font()
+        textWidth = self.textWidth()
+        metrics = textMetrics.lookup(text, font, textWidth)
+        if metrics is None:
+            metrics = textMetrics.store(text, font, textWidth, self)
+        self.width = metrics.width
+        self.height = metrics.height
+        self.rect = QRectF(*metrics.rect)
+        if self.rectItem is not None:
+            self.rectItem.setRect(self.xboundingRect())
         self.debugBoundingRect()
 
     def boundingRect(self):
@@ -480,7 +378,7 @@ class GraphicsTextItem(QGraphicsTextItem):
         return self.xfm.mapRect(self.boundingRect())
 
     def debugBoundingRect(self):
-        if logger.getEffectiveLevel() == logging.DEBUG:
+        if logger.isEnabledFor(logging.DEBUG):
             if self.rectItem is None:
                 self.rectItem = QGraphicsRectItem(self.xboundingRect())
                 self.rectItem.setParentItem(self.parentItem())
@@ -491,19 +389,13 @@ class GraphicsTextItem(QGraphicsTextItem):
                 self.rectItem.setPos(self.pos())
 
     def __del__(self):
-        if logger.getEffectiveLevel() == logging.DEBUG:
+        if logger.isEnabledFor(logging.DEBUG):
             if self.rectItem is not None:
                 self.scene.removeItem(self.rectItem )
-                logger.debug(f"Removed rectItem for {self.toPlainText()}")
+                logger.debug("Removed rectItem for %s", self.toPlainText())
                 sip.delete( self.rectItem)
                 self.scene.update()
 
-    def getPoints(self ):
-        return [self.pos() + self.xfm.map(self.boundingRect().bottomLeft()),
-                self.pos() + self.xfm.map(self.boundingRect().bottomRight()),
-                self.pos() + self.xfm.map(self.boundingRect().topRight()),
-                self.pos() + self.xfm.map(self.boundingRect().topLeft())]
-
     def centerPos(self):
         return self.pos() + self.xfm.map(self.boundingRect().center())
 
@@ -535,7 +427,8 @@ class GraphicsTextItem(QGraphicsTextItem):
         # Calculate angle of line from center to refPt
         line = QLineF(self.centerPos(), refPt)
         if line.length() == 0:
-            logger.debug(f"{self.toPlainText()} has the same position as refPt")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s has the same position as refPt", self.toPlainText())
             raise Exception("Same location, refPt must be different than self.centerPos()")
         ang = quadrantAngleOfLine(line)
         rect = self.xboundingRect()
@@ -598,13 +491,21 @@ class GraphicsTextItemDropDown(GraphicsTextItem):
 
         self.textlist = textlist
         text = self.textlist[0][0]
-        logger.debug(f"textlist is {textlist}")
+        logger.debug("textlist is %s", textlist)
         super().__init__( scene,  text, font, tcolor, parent=None)
         self.setToolTip(self.textlist[0][1])
 
         self.setFlags(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable | QGraphicsItem.GraphicsItemFlag.ItemIsFocusable )
         self.chrddlg = ChordDig([i[0] for i in self.textlist])
-        logger.debug(f"chords are {[i[0] for i in self.textlist]}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("chords are %s", [i[0] for i in self.textlist])
+
+    def setTextList(self, textlist):
+        '''replaces the drop down list, showing its first entry'''
+        self.textlist = textlist
+        self.setText(self.textlist[0][0])
+        self.setToolTip(self.textlist[0][1])
+        self.chrddlg = ChordDig([i[0] for i in self.textlist])
 
 
     def mousePressEvent(self, event):
@@ -636,6 +537,80 @@ class GraphicsTextItemDropDown(GraphicsTextItem):
 
 
 
+class ItemPool:
+    '''
+    ItemPool keeps GraphicsTextItems, GraphicsTextItemDropDowns and CircleGraphicsItems that were removed
+    from the scene so drawText and drawCircle can re-arm them with new text, font size and color instead of
+    building new ones (QFont, QTextDocument, QTransform ...).  Items must only be released once nothing
+    else refers to them.  stats() returns the hits (reused), misses (newly built) and free item counts.
+    param maxFree: the most detached items kept per item class
+    '''
+    def __init__(self, maxFree=1000):
+        self.maxFree = maxFree
+        self._free = {}
+        self.hits = 0
+        self.misses = 0
+
+    def release(self, item):
+        if type(item) not in (GraphicsTextItem, GraphicsTextItemDropDown, CircleGraphicsItem):
+            return
+        free = self._free.setdefault(type(item), [])
+        if len(free) >= self.maxFree:
+            return
+        if isinstance(item, GraphicsTextItem) and item.rectItem is not None:
+            # the debug bounding rect goes with the item
+            item.scene.removeItem(item.rectItem)
+            item.rectItem = None
+        free.append(item)
+
+    def _acquire(self, itemClass):
+        free = self._free.get(itemClass)
+        if free:
+            self.hits += 1
+            return free.pop()
+        self.misses += 1
+        return None
+
+    def text(self, scene, text, font, tcolor):
+        '''returns a GraphicsTextItem, or a GraphicsTextItemDropDown if text is a list'''
+        itemClass = GraphicsTextItemDropDown if isinstance(text, list) else GraphicsTextItem
+        strItem = self._acquire(itemClass)
+        if strItem is None:
+            return itemClass(scene, text, font, tcolor)
+        strItem.scene = scene
+        strItem.setFont(font)
+        strItem.setDefaultTextColor(tcolor)
+        strItem.setTextWidth(-1)
+        strItem.setPos(0, 0)
+        strItem.polycont = None
+        strItem.ring = None
+        strItem.col = None
+        strItem.setToolTip('')
+        if itemClass is GraphicsTextItemDropDown:
+            strItem.setTextList(text)
+        else:
+            strItem.setText(text)
+        return strItem
+
+    def circle(self, x, y, d, noteId=None, acceptMousebuttons=False):
+        ellipse = self._acquire(CircleGraphicsItem)
+        if ellipse is None:
+            return CircleGraphicsItem(x, y, d, noteId=noteId, acceptMousebuttons=acceptMousebuttons)
+        ellipse.setRect(x, y, d, d)
+        ellipse.setBrush(QBrush())
+        ellipse.noteId = noteId
+        ellipse.setSelectable(acceptMousebuttons)
+        ellipse.isSelected = False
+        return ellipse
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'free': {itemClass.__name__: len(free) for itemClass, free in self._free.items()}}
+
+
+itemPool = ItemPool()
+
+
 def drawText(scene, pt, text, size=10, position=Pos.CENTER, refPt=QPointF(0,0), pen=QPen(Qt.GlobalColor.black), txtWidth=None):
     ''' drawText draws text relative to the position of the bounding box.  x, y define where that
     boundary box position will be located.
@@ -644,30 +619,22 @@ def drawText(scene, pt, text, size=10, position=Pos.CENTER, refPt=QPointF(0,0),
     tcolor = pen.color()
     # print(QFontInfo(font).family())
     font.setPointSize(size)
-    if isinstance(text, list):
-        strItem = GraphicsTextItemDropDown(scene, text, font, tcolor)
-    else:
-        strItem = GraphicsTextItem(scene, text, font, tcolor)
+    strItem = itemPool.text(scene, text, font, tcolor)
     #strItem.setToolTip("This is the hover text")
 
-    #DEBUG
-    # pen = QPen(Qt.GlobalColor.red)
-    # drawCircle(scene, pt, 5, pen)
-    #strItem.setDefaultTextColor(tcolor)
-    #strItem.setFont(font)
-
-    # if text[:3] == '<p>':
-    #     strItem.setHtml(text)
-    # else:
-    #     strItem.setPlainText(text)
-
-    fm = strItem.font()
-
     if txtWidth is not None:
         if txtWidth > 0:
             strItem.setTextWidth(txtWidth)
 
+    placeText(strItem, pt, position, refPt)
+
+    scene.addItem(strItem)
+
+    return strItem
+
 
+def placeText(strItem, pt, position=Pos.CENTER, refPt=QPointF(0,0)):
+    ''' positions strItem relative to its bounding box at pt, see drawText '''
     xoffset = 0
     yoffset = 0
 
@@ -688,7 +655,8 @@ def drawText(scene, pt, text, size=10, position=Pos.CENTER, refPt=QPointF(0,0),
         maxDist, minDist = strItem.getMaxMinDistances(refPt)
         refLine = QLineF(refPt, pt)
         refDist = refLine.length()
-        logger.debug(f"refLine length is {refDist}, maxDist is {maxDist}, minDist is {minDist}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("refLine length is %s, maxDist is %s, minDist is %s", refDist, maxDist, minDist)
         delta = refDist - maxDist
         ang = math.atan2(pt.y()-refPt.y(), pt.x()-refPt.x())
         xoffset = delta * math.cos(ang)
@@ -703,34 +671,28 @@ def drawText(scene, pt, text, size=10, position=Pos.CENTER, refPt=QPointF(0,0),
         maxDist, minDist = strItem.getMaxMinDistances(refPt)
         refLine = QLineF(refPt, pt)
         refDist = refLine.length()
-        logger.debug(f"refLine length is {refDist}, maxDist is {maxDist}, minDist is {minDist}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("refLine length is %s, maxDist is %s, minDist is %s", refDist, maxDist, minDist)
         delta = refDist - minDist
         ang = angleOfLine(refLine)
         xoffset = delta * math.cos(ang)
         yoffset = delta * math.sin(ang)
-        logger.debug(f"QLineF center to refpt angle is {math.degrees(ang)}")
-        logger.debug(f"x: {xoffset} is applied to {pt.x()}")
-        logger.debug(f"y: {yoffset} is applied to {pt.y()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("QLineF center to refpt angle is %s", math.degrees(ang))
+            logger.debug("x: %s is applied to %s", xoffset, pt.x())
+            logger.debug("y: %s is applied to %s", yoffset, pt.y())
 
 
     newPt = QPointF(pt.x() + xoffset, pt.y() + yoffset)
 
     strItem.setCenterPos(newPt)
 
-    scene.addItem(strItem)
-
-
-
-
-
-    return strItem
-
 
 def drawCircle(scene, cpt, d, pen, brush=None, noteId=None, acceptMousebuttons=False):
     x = cpt.x() - d / 2
     y = cpt.y() - d / 2
     # x, y w h  (x,y are the lower left corner)
-    ellipse = CircleGraphicsItem(x, y, d, noteId=noteId, acceptMousebuttons=acceptMousebuttons)
+    ellipse = itemPool.circle(x, y, d, noteId=noteId, acceptMousebuttons=acceptMousebuttons)
     ellipse.setPen(pen)
     if brush:
         ellipse.setBrush(brush)
@@ -751,6 +713,152 @@ def drawLine(scene, pt1, pt2, pen=None):
     return alineItem
 
 
+class SceneItems:
+    '''
+    SceneItems holds the graphic items of one drawing (a scale, the Stradella layout, titles)
+    keyed by a slot id.  A redraw asks for the same slots again and only the items whose text, size,
+    position or pen differ from the last draw are changed, in place.  Items that are not asked for
+    again are removed from the scene by end().
+    Slots can belong to a group (ex. the chord texts of one scale degree).  keepGroup() tells if a
+    group is drawn with the same inputs as last time in which case all its items are kept as they are.
+    Usage:
+        items.begin()
+        items.text(slot, ...), items.circle(slot, ...), items.line(slot, ...)
+        items.end()
+    '''
+    def __init__(self, scene):
+        self.scene = scene
+        self._slots = {}    # slot -> [spec, item, group]
+        self._groups = {}   # group -> spec
+        self._drawn = set()
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __iter__(self):
+        return iter([aslot[1] for aslot in self._slots.values()])
+
+    def begin(self):
+        self._drawn = set()
+
+    def end(self):
+        '''removes the items that were not drawn since begin()'''
+        for slot in [slot for slot in self._slots if slot not in self._drawn]:
+            spec, item, group = self._slots.pop(slot)
+            self._remove(item)
+        self._groups = {group: spec for group, spec in self._groups.items()
+                        if any(aslot[2] == group for aslot in self._slots.values())}
+
+    def clear(self):
+        self.begin()
+        self.end()
+        self._groups = {}
+
+    def _remove(self, item):
+        self.scene.removeItem(item)
+        itemPool.release(item)
+
+    def keepGroup(self, group, spec):
+        '''
+        Returns True, and keeps all the items of group, if group was last drawn with the same spec.
+        Otherwise the new spec is recorded and the group's items must be drawn again.
+        '''
+        if group in self._groups and self._groups[group] == spec:
+            for slot, aslot in self._slots.items():
+                if aslot[2] == group:
+                    self._drawn.add(slot)
+            return True
+        self._groups[group] = spec
+        return False
+
+    def add(self, slot, item, group=None):
+        '''puts an item that is built elsewhere in slot, replacing any previous one'''
+        if slot in self._slots:
+            self._remove(self._slots[slot][1])
+        self.scene.addItem(item)
+        self._slots[slot] = [None, item, group]
+        self._drawn.add(slot)
+        return item
+
+    def text(self, slot, pt, text, size=10, position=Pos.CENTER, refPt=QPointF(0,0),
+             pen=QPen(Qt.GlobalColor.black), txtWidth=None, group=None):
+        '''same as drawText for a slot.  Items in a group are always placed again as they get laid out later'''
+        isList = isinstance(text, list)
+        spec = (text, size, position, QPointF(refPt), pen.color(), txtWidth, QPointF(pt))
+        self._drawn.add(slot)
+        aslot = self._slots.get(slot)
+        if aslot is not None and isinstance(aslot[1], GraphicsTextItemDropDown) == isList:
+            item = aslot[1]
+            if aslot[0] == spec and group is None:
+                return item
+            oldText, oldSize, oldPosition, oldRefPt, oldColor, oldTxtWidth, oldPt = aslot[0]
+            if oldSize != size:
+                font = item.font()
+                font.setPointSize(size)
+                item.setFont(font)
+            if oldColor != spec[4]:
+                item.setDefaultTextColor(spec[4])
+            if oldText != text or oldSize != size or oldTxtWidth != txtWidth:
+                item.setTextWidth(-1)
+                if isList:
+                    item.setTextList(text)
+                else:
+                    item.setText(text)
+                if txtWidth is not None and txtWidth > 0:
+                    item.setTextWidth(txtWidth)
+            # ring and col are from the item's last layout
+            item.ring = None
+            item.col = None
+            placeText(item, pt, position, refPt)
+            aslot[0] = spec
+            aslot[2] = group
+            return item
+        if aslot is not None:
+            self._remove(aslot[1])
+        item = drawText(self.scene, pt, text, size, position, refPt, pen, txtWidth)
+        self._slots[slot] = [spec, item, group]
+        return item
+
+    def circle(self, slot, cpt, d, pen, brush=None, group=None):
+        '''same as drawCircle for a slot'''
+        spec = (QPointF(cpt), d, pen, brush)
+        self._drawn.add(slot)
+        aslot = self._slots.get(slot)
+        if aslot is not None and isinstance(aslot[1], CircleGraphicsItem):
+            item = aslot[1]
+            if aslot[0] != spec:
+                item.setRect(cpt.x() - d / 2, cpt.y() - d / 2, d, d)
+                item.setPen(pen)
+                item.setBrush(brush if brush else Brushes().none)
+                aslot[0] = spec
+            aslot[2] = group
+            return item
+        if aslot is not None:
+            self._remove(aslot[1])
+        item = drawCircle(self.scene, cpt, d, pen, brush)
+        self._slots[slot] = [spec, item, group]
+        return item
+
+    def line(self, slot, pt1, pt2, pen=None, group=None):
+        '''same as drawLine for a slot'''
+        spec = (QPointF(pt1), QPointF(pt2), pen)
+        self._drawn.add(slot)
+        aslot = self._slots.get(slot)
+        if aslot is not None and isinstance(aslot[1], QGraphicsLineItem):
+            item = aslot[1]
+            if aslot[0] != spec:
+                item.setLine(QLineF(pt1, pt2))
+                item.setPen(pen)
+                aslot[0] = spec
+            aslot[2] = group
+            return item
+        if aslot is not None:
+            self._remove(aslot[1])
+        item = drawLine(self.scene, pt1, pt2, pen)
+        self._slots[slot] = [spec, item, group]
+        return item
+
+
 class Brushes:
     def __init__(self):
         self.none = QBrush(Qt.BrushStyle.NoBrush)